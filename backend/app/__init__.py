@@ -34,8 +34,9 @@ def create_app(config_class=Config):
     app.register_blueprint(schedule_bp, url_prefix='/api/schedule')
     
     # Register CLI commands
-    from app.cli import create_admin
+    from app.cli import create_admin, prune_schedule_runs
     app.cli.add_command(create_admin)
+    app.cli.add_command(prune_schedule_runs)
     
     # Create database tables
     with app.app_context():
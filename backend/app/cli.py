@@ -1,8 +1,10 @@
 import click
+from flask import current_app
 from flask.cli import with_appcontext
 from app import db
 from app.models.user import User
 from app.routes.auth import validate_email, validate_password
+from scheduler_engine.history import prune_runs
 
 @click.command('create-admin')
 @click.option('--email', prompt='Admin email', help='Email for the admin user')
@@ -37,4 +39,18 @@ def create_admin(email, password):
     except Exception as e:
         db.session.rollback()
         click.echo('Error: Failed to create admin user')
-        click.echo(str(e)) 
\ No newline at end of file
+        click.echo(str(e)) 
+
+@click.command('prune-runs')
+@click.option('--keep', type=int, default=None, help='Number of most recent runs to keep (default: SCHEDULE_RUN_RETENTION)')
+@click.option('--batch-size', type=int, default=None, help='Entries deleted per transaction (default: SCHEDULE_RUN_GC_BATCH_SIZE)')
+@with_appcontext
+def prune_schedule_runs(keep, batch_size):
+    """Delete old schedule runs and their entries."""
+    keep = keep if keep is not None else current_app.config['SCHEDULE_RUN_RETENTION']
+    if keep < 1:
+        click.echo('Error: --keep must be at least 1 (SCHEDULE_RUN_RETENTION=0 keeps every run)')
+        return
+    batch_size = batch_size or current_app.config['SCHEDULE_RUN_GC_BATCH_SIZE']
+    deleted = prune_runs(db.session, keep, batch_size)
+    click.echo(f'Deleted {deleted} schedule run(s)')
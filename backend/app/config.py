@@ -9,3 +9,14 @@ class Config:
     # JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-secret-key-here')  # Change this in production!
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+
+    # Schedule history: runs kept after each generation/repair (0 keeps every run),
+    # and how many entries the pruning deletes per transaction
+    SCHEDULE_RUN_RETENTION = int(os.getenv('SCHEDULE_RUN_RETENTION', '50'))
+    SCHEDULE_RUN_GC_BATCH_SIZE = int(os.getenv('SCHEDULE_RUN_GC_BATCH_SIZE', '1000'))
+
+    # Background generation jobs (?async=true): the JobQueue class, given as 'module.Class',
+    # its worker threads, and how many finished jobs stay available for polling
+    SCHEDULE_JOB_QUEUE = os.getenv('SCHEDULE_JOB_QUEUE', 'app.jobs.InProcessJobQueue')
+    SCHEDULE_JOB_WORKERS = int(os.getenv('SCHEDULE_JOB_WORKERS', '2'))
+    SCHEDULE_JOB_HISTORY = int(os.getenv('SCHEDULE_JOB_HISTORY', '100'))
@@ -0,0 +1,220 @@
+# Background schedule generation jobs
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from importlib import import_module
+from flask import current_app
+from app import db
+from scheduler_engine.cancellation import Cancelled, CancelToken
+from scheduler_engine.generator import generate_schedule, repair_schedule
+from scheduler_engine.history import prune_runs
+
+# Job kind -> generator function; a job's options are that function's keyword arguments
+JOB_KINDS = {
+    'generate': generate_schedule,
+    'repair': repair_schedule,
+}
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+_queue_lock = threading.Lock()
+
+
+def prune_history(session):
+    """Applies the configured run retention after a new run was saved."""
+    prune_runs(session, current_app.config['SCHEDULE_RUN_RETENTION'] or None,
+               current_app.config['SCHEDULE_RUN_GC_BATCH_SIZE'])
+
+
+class Job:
+    """
+    One generate or repair request handed to a JobQueue.
+    status: 'queued', 'running', 'succeeded', 'failed' or 'cancelled'
+    progress: the latest generator progress fields, e.g. {'phase': 'solve', 'placed': 120}
+    result: the generator's result without 'schedule'; the entries are read back from the run
+    version: incremented on every state change, so watchers can tell when to report again
+    token: the CancelToken of the run, held by the process running the job
+    progress is changed under the job's lock, so as_dict can copy it while the worker reports.
+    options must be JSON-serialisable so any backend can store them.
+    """
+
+    def __init__(self, kind, options, job_id=None):
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'. Must be one of: {', '.join(JOB_KINDS)}")
+        self.id = job_id or str(uuid.uuid4())
+        self.kind = kind
+        self.options = options
+        self.status = 'queued'
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self.version = 0
+        self.token = CancelToken()
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATUSES
+
+    def as_dict(self):
+        with self._lock:
+            progress = dict(self.progress)
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': progress,
+            'run_id': self.result['run_id'] if self.result else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+def run_job(app, job, queue):
+    """
+    Runs a job to completion in an app context of its own, saving every state change through
+    queue.update. The workers of every JobQueue call this, in the web process or another one.
+    """
+    def save():
+        job.version += 1
+        queue.update(job)
+
+    if job.status == 'cancelled':
+        return
+    with app.app_context():
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        save()
+
+        def progress(event):
+            with job._lock:
+                job.progress.update({k: v for k, v in event.items() if k != 'type'})
+            save()
+
+        try:
+            result = JOB_KINDS[job.kind](db.session, progress=progress, token=job.token, **job.options)
+            if result is None:
+                raise LookupError('No schedule run to repair')
+            prune_history(db.session)
+            result.pop('schedule')
+            job.result = result
+            job.status = 'succeeded'
+        except Cancelled:
+            db.session.rollback()
+            job.status = 'cancelled'
+        except Exception as e:
+            db.session.rollback()
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = datetime.utcnow()
+            save()
+            db.session.remove()
+
+
+class JobQueue:
+    """
+    Job backend interface.
+    submit(job) queues a job and returns it; get(job_id) returns the job's current state, or None;
+    update(job) saves a state change made by the worker running it; wait(job_id, version, timeout)
+    blocks until the job's version differs from version, polling get() unless overridden;
+    cancel(job_id) stops a queued job from starting and cancels a running job's token.
+    A backend whose workers run in a separate process keeps jobs in storage both processes
+    share, and has each worker call run_job(app, job, queue) for the jobs it takes.
+    Backends are built with the Flask app: SCHEDULE_JOB_QUEUE names the class to use.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def submit(self, job):
+        raise NotImplementedError
+
+    def get(self, job_id):
+        raise NotImplementedError
+
+    def update(self, job):
+        raise NotImplementedError
+
+    def cancel(self, job_id):
+        raise NotImplementedError
+
+    def wait(self, job_id, version, timeout):
+        """Returns the job once its version differs from version, or as it is after timeout seconds."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job.version != version or time.monotonic() >= deadline:
+                return job
+            time.sleep(min(0.2, max(0.0, deadline - time.monotonic())))
+
+
+class InProcessJobQueue(JobQueue):
+    """
+    Runs jobs on a thread pool of SCHEDULE_JOB_WORKERS threads in the web process.
+    Jobs live in memory; the SCHEDULE_JOB_HISTORY most recent finished ones are kept for polling.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.history = app.config['SCHEDULE_JOB_HISTORY']
+        self._executor = ThreadPoolExecutor(max_workers=app.config['SCHEDULE_JOB_WORKERS'],
+                                            thread_name_prefix='schedule-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def submit(self, job):
+        with self._lock:
+            self._jobs[job.id] = job
+            finished = [j.id for j in self._jobs.values() if j.finished]
+            for job_id in finished[:max(0, len(finished) - self.history)]:
+                del self._jobs[job_id]
+        self._executor.submit(run_job, self.app, job, self)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Returns the job, or None if there is no such job; finished jobs are left as they are."""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            job.token.cancel()
+            if job.status == 'queued':
+                job.status = 'cancelled'
+                job.finished_at = datetime.utcnow()
+                job.version += 1
+                self._changed.notify_all()
+            return job
+
+    def update(self, job):
+        # Workers change the shared Job object itself; only wake up the waiters
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait(self, job_id, version, timeout):
+        with self._changed:
+            self._changed.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id].version != version, timeout)
+            return self._jobs.get(job_id)
+
+
+def get_job_queue(app=None):
+    """The app's JobQueue, built from SCHEDULE_JOB_QUEUE on first use."""
+    app = app or current_app._get_current_object()
+    with _queue_lock:
+        if 'schedule_jobs' not in app.extensions:
+            module_name, class_name = app.config['SCHEDULE_JOB_QUEUE'].rsplit('.', 1)
+            app.extensions['schedule_jobs'] = getattr(import_module(module_name), class_name)(app)
+        return app.extensions['schedule_jobs']
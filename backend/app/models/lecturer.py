@@ -11,6 +11,10 @@ lecturer_timeslot = db.Table('lecturer_timeslot',
 
 class Lecturer(db.Model):
     __tablename__ = 'lecturers'
+    __table_args__ = (
+        db.Index('ix_lecturers_name_id', 'name', 'id'),
+        db.Index('ix_lecturers_specialty_id', 'specialty', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -3,6 +3,11 @@ from datetime import datetime
 
 class Module(db.Model):
     __tablename__ = 'modules'
+    __table_args__ = (
+        db.Index('ix_modules_name_id', 'name', 'id'),
+        db.Index('ix_modules_program_level_id_id', 'program_level_id', 'id'),
+        db.Index('ix_modules_weekly_hours_id', 'weekly_hours', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     code = db.Column(db.String(10), unique=True, nullable=False)
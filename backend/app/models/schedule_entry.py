@@ -3,13 +3,15 @@ from datetime import datetime
 
 class ScheduleEntry(db.Model):
     __tablename__ = 'schedule_entries'
+    # Serves run lookups, keyset pages of a run in id order and run pruning
+    __table_args__ = (db.Index('ix_schedule_entries_run_id_id', 'run_id', 'id'),)
     
     id = db.Column(db.Integer, primary_key=True)
     module_id = db.Column(db.Integer, db.ForeignKey('modules.id'), nullable=False)
     lecturer_id = db.Column(db.Integer, db.ForeignKey('lecturers.id'), nullable=False)
     room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
     timeslot_id = db.Column(db.Integer, db.ForeignKey('timeslots.id'), nullable=False)
-    run_id = db.Column(db.String(36), nullable=False)  # UUID for batch runs
+    run_id = db.Column(db.String(36), nullable=False)  # UUID for batch runs, see ScheduleRun
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
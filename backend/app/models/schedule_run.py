@@ -0,0 +1,22 @@
+from app import db
+from datetime import datetime
+
+class ScheduleRun(db.Model):
+    __tablename__ = 'schedule_runs'
+    
+    id = db.Column(db.String(36), primary_key=True)  # UUID, matches ScheduleEntry.run_id
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    # Set on creation and again whenever a cache hit returns the run; the latest run and retention go by it
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    solver = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    entry_count = db.Column(db.Integer, nullable=False, default=0)
+    conflict_count = db.Column(db.Integer, nullable=False, default=0)
+    duration_seconds = db.Column(db.Float, nullable=False, default=0.0)
+    # Hash of the problem snapshot and solver options (see Problem.fingerprint), None for repairs
+    fingerprint = db.Column(db.String(64), nullable=True, index=True)
+    # conflict_summary and solver_stats of the generation, returned again on a cache hit
+    summary = db.Column(db.JSON, nullable=True)
+    
+    def __repr__(self):
+        return f'<ScheduleRun {self.id} {self.solver} {self.status}>'
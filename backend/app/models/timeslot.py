@@ -3,6 +3,12 @@ from datetime import datetime
 
 class Timeslot(db.Model):
     __tablename__ = 'timeslots'
+    __table_args__ = (
+        db.Index('ix_timeslots_day_id', 'day', 'id'),
+        db.Index('ix_timeslots_start_time_id', 'start_time', 'id'),
+        db.Index('ix_timeslots_end_time_id', 'end_time', 'id'),
+        db.Index('ix_timeslots_is_weekend_id', 'is_weekend', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     day = db.Column(db.String(10), nullable=False)
@@ -5,6 +5,7 @@ from app.models.user import User
 from app import db
 from functools import wraps
 from sqlalchemy import or_, desc
+from app.utils import cursor_page
 from app.schemas.lecturer import LecturerResponse, LecturerCreate, LecturerUpdate
 from app.schemas.timeslot import TimeslotResponse
 
@@ -147,6 +148,13 @@ def get_lecturers():
                 )
             )
         
+        if 'cursor' in request.args:
+            data, page_error = cursor_page(request.args, query, sort_column, Lecturer.id, per_page, 'lecturers',
+                                           lambda item: LecturerResponse.model_validate(item).model_dump())
+            if page_error:
+                return error_response(page_error, BAD_REQUEST)
+            return success_response(data)
+
         # Apply sorting
         query = query.order_by(sort_column)
         
@@ -5,6 +5,7 @@ from app.models.user import User
 from app import db
 from functools import wraps
 from sqlalchemy import or_, desc
+from app.utils import cursor_page
 from app.schemas.module import ModuleResponse, ModuleCreate, ModuleUpdate
 
 modules_bp = Blueprint('modules', __name__)
@@ -50,7 +51,7 @@ def get_sort_params():
     valid_sort_fields = {
         'code': Module.code,
         'name': Module.name,
-        'program_level': Module.program_level,
+        'program_level': Module.program_level_id,
         'weekly_hours': Module.weekly_hours
     }
     
@@ -129,6 +130,13 @@ def get_modules():
                 )
             )
         
+        if 'cursor' in request.args:
+            data, page_error = cursor_page(request.args, query, sort_column, Module.id, per_page, 'modules',
+                                           lambda item: ModuleResponse.model_validate(item).model_dump())
+            if page_error:
+                return error_response(page_error, BAD_REQUEST)
+            return success_response(data)
+
         # Apply sorting
         query = query.order_by(sort_column)
         
@@ -5,6 +5,7 @@ from app.models.user import User
 from app import db
 from functools import wraps
 from sqlalchemy import or_, desc
+from app.utils import cursor_page
 
 program_levels_bp = Blueprint('program_levels', __name__)
 
@@ -137,6 +138,13 @@ def get_program_levels():
                 )
             )
         
+        if 'cursor' in request.args:
+            data, page_error = cursor_page(request.args, query, sort_column, ProgramLevel.id, per_page, 'program_levels',
+                                           ProgramLevel.to_dict)
+            if page_error:
+                return error_response(page_error, BAD_REQUEST)
+            return success_response(data)
+
         # Apply sorting
         query = query.order_by(sort_column)
         
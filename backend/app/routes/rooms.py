@@ -5,6 +5,7 @@ from app.models.user import User
 from app import db
 from functools import wraps
 from sqlalchemy import or_, desc
+from app.utils import cursor_page
 from app.schemas.room import RoomResponse, RoomCreate, RoomUpdate
 
 rooms_bp = Blueprint('rooms', __name__)
@@ -121,6 +122,13 @@ def get_rooms():
                 )
             )
         
+        if 'cursor' in request.args:
+            data, page_error = cursor_page(request.args, query, sort_column, Room.id, per_page, 'rooms',
+                                           lambda item: RoomResponse.model_validate(item).model_dump())
+            if page_error:
+                return error_response(page_error, BAD_REQUEST)
+            return success_response(data)
+
         # Apply sorting
         query = query.order_by(sort_column)
         
@@ -1,10 +1,16 @@
-from flask import Blueprint, jsonify, request
-from scheduler_engine.generator import generate_schedule
+from flask import Blueprint, Response, jsonify, request, stream_with_context, url_for
+from scheduler_engine.generator import (generate_schedule, get_run_entries, get_run_page, iter_run_entries,
+                                       repair_schedule)
+from scheduler_engine.solvers import SOLVERS
+from scheduler_engine.ordering import MODULE_ORDERINGS, DEFAULT_ORDERING
+from scheduler_engine.timeslots import DAYS
 from app import db
-from app.models.schedule_entry import ScheduleEntry
-from sqlalchemy import func
-from app.schemas.schedule import ScheduleEntryResponse, RunSummaryResponse, ScheduleGenerationResponse
+from app.jobs import Job, get_job_queue, prune_history
+from app.models.schedule_run import ScheduleRun
+from app.schemas.schedule import RunSummaryResponse
 from datetime import datetime
+import json
+import time
 
 
 schedule_bp = Blueprint('schedule', __name__)
@@ -13,28 +19,51 @@ schedule_bp = Blueprint('schedule', __name__)
 def get_db():
     return db.session
 
-@schedule_bp.route('/generate', methods=['POST'])
-def generate_schedule_route():
-    try:
-        session = get_db()
-        result = generate_schedule(session)
-        
-        # Ensure all values are basic Python types
-        schedule = []
-        for entry in result['schedule']:
-            schedule.append({
-                'id': int(entry['id']),
-                'module_id': int(entry['module_id']),
-                'lecturer_id': int(entry['lecturer_id']),
-                'room_id': int(entry['room_id']),
-                'timeslot_id': int(entry['timeslot_id']),
-                'day': str(entry['day']),
-                'start_time': str(entry['start_time']),
-                'end_time': str(entry['end_time']),
-                'run_id': str(entry['run_id']),
-                'created_at': str(entry['created_at']) if entry['created_at'] else None
-            })
-        
+CONFLICT_MODES = ('summary', 'detail')
+TRUE_VALUES = ('true', '1', 'yes')
+# Server-sent events: entries per 'schedule' event, and seconds between keep-alive comments
+STREAM_CHUNK_SIZE = 500
+STREAM_KEEPALIVE = 15
+# GET /runs/<run_id>: default and largest page size
+RUN_PAGE_SIZE = 100
+RUN_PAGE_MAX = 1000
+
+def format_entry(entry):
+    # Ensure all values are basic Python types
+    return {
+        'id': int(entry['id']),
+        'module_id': int(entry['module_id']),
+        'lecturer_id': int(entry['lecturer_id']),
+        'room_id': int(entry['room_id']),
+        'timeslot_id': int(entry['timeslot_id']),
+        'day': str(entry['day']),
+        'start_time': str(entry['start_time']),
+        'end_time': str(entry['end_time']),
+        'run_id': str(entry['run_id']),
+        'created_at': str(entry['created_at']) if entry['created_at'] else None
+    }
+
+def format_generation_result(result):
+    """Builds the JSON response for generate_schedule / repair_schedule results."""
+    response = {
+        'schedule': [format_entry(entry) for entry in result['schedule']],
+        'run_id': result['run_id'],
+        'solver': result['solver'],
+        'status': result['status'],
+        'conflict_summary': result['conflict_summary'],
+        'timings': result['timings'],
+        'cached': result.get('cached', False)
+    }
+    if 'solver_stats' in result:
+        response['solver_stats'] = result['solver_stats']
+    if 'stats' in result:
+        response['stats'] = result['stats']
+    if 'presolve' in result:
+        response['presolve'] = result['presolve']
+    if 'repair' in result:
+        response['repair'] = result['repair']
+
+    if 'conflicts' in result:
         conflicts = []
         for conflict in result['conflicts']:
             conflicts.append({
@@ -46,34 +75,271 @@ def generate_schedule_route():
                 'capacity': int(conflict.get('capacity', 0)),
                 'required': int(conflict.get('required', 0))
             })
+        response['conflicts'] = conflicts
+    return response
+
+def generation_response(result):
+    """format_generation_result, adding its own time to the stats block when one was requested."""
+    started = time.perf_counter()
+    response = format_generation_result(result)
+    if 'stats' in response:
+        stats = response['stats']
+        response['stats'] = {**stats, 'phases': {**stats['phases'], 'serialize': round(time.perf_counter() - started, 6)}}
+    return response
+
+def flag(name, default='false'):
+    return request.args.get(name, default).lower() in TRUE_VALUES
+
+def parse_generate_options():
+    """Get and validate the generate_schedule keyword arguments from the query string."""
+    # ?conflicts=detail returns every conflict; the default summary only returns counters
+    conflict_mode = request.args.get('conflicts', 'summary').lower()
+    if conflict_mode not in CONFLICT_MODES:
+        return None, f"Invalid conflicts mode. Must be one of: {', '.join(CONFLICT_MODES)}"
+    # ?solver=cpsat&time_limit=60 picks the backend and its wall-clock budget in seconds
+    solver = request.args.get('solver', 'greedy').lower()
+    if solver not in SOLVERS:
+        return None, f"Invalid solver. Must be one of: {', '.join(SOLVERS)}"
+    options = {
+        'conflict_detail': conflict_mode == 'detail',
+        'solver': solver,
+        # ?cache=false solves again even if a run with the same input and options exists
+        'use_cache': flag('cache', 'true'),
+        # ?stats=true adds per-phase timings and solver counters to the response
+        'include_stats': flag('stats'),
+    }
+    time_limit = request.args.get('time_limit', type=float)
+    if time_limit is not None:
+        if time_limit <= 0:
+            return None, "time_limit must be a positive number of seconds"
+        options['time_limit'] = time_limit
+    max_seconds, error = parse_max_seconds()
+    if error:
+        return None, error
+    if max_seconds is not None:
+        options['max_seconds'] = max_seconds
+    # ?ordering=db keeps query order, for benchmarking against the heuristics
+    ordering = request.args.get('ordering')
+    if ordering is not None:
+        ordering = ordering.lower()
+        if ordering not in MODULE_ORDERINGS:
+            return None, f"Invalid ordering. Must be one of: {', '.join(MODULE_ORDERINGS)}"
+        options['ordering'] = ordering
+    # ?seed= makes randomised solvers (lns, cpsat) reproducible
+    seed = request.args.get('seed', type=int)
+    if seed is not None:
+        options['seed'] = seed
+    # ?workers= sets the process count for solver=portfolio
+    workers = request.args.get('workers', type=int)
+    if workers is not None:
+        if solver != 'portfolio' or workers < 1:
+            return None, "workers must be a positive integer and requires solver=portfolio"
+        options['workers'] = workers
+    return options, None
+
+def parse_max_seconds():
+    # ?max_seconds= is a hard deadline for the whole run; the best schedule so far is saved when it passes
+    max_seconds = request.args.get('max_seconds', type=float)
+    if max_seconds is not None and max_seconds <= 0:
+        return None, "max_seconds must be a positive number of seconds"
+    return max_seconds, None
+
+def parse_repair_options():
+    """Get and validate the repair_schedule keyword arguments from the query string."""
+    conflict_mode = request.args.get('conflicts', 'summary').lower()
+    if conflict_mode not in CONFLICT_MODES:
+        return None, f"Invalid conflicts mode. Must be one of: {', '.join(CONFLICT_MODES)}"
+    ordering = request.args.get('ordering', DEFAULT_ORDERING).lower()
+    if ordering not in MODULE_ORDERINGS:
+        return None, f"Invalid ordering. Must be one of: {', '.join(MODULE_ORDERINGS)}"
+    max_seconds, error = parse_max_seconds()
+    if error:
+        return None, error
+    options = {'conflict_detail': conflict_mode == 'detail', 'include_stats': flag('stats'), 'ordering': ordering}
+    if max_seconds is not None:
+        options['max_seconds'] = max_seconds
+    return options, None
+
+def submit_job(kind, options):
+    """Queues a background job; the response points at its status endpoint."""
+    job = get_job_queue().submit(Job(kind, options))
+    status_url = url_for('schedule.get_job', job_id=job.id)
+    return jsonify({**job.as_dict(), 'status_url': status_url}), 202, {'Location': status_url}
+
+
+@schedule_bp.route('/generate', methods=['POST'])
+def generate_schedule_route():
+    options, error = parse_generate_options()
+    if error:
+        return jsonify({'error': error}), 400
+    # ?async=true returns a job id at once and solves in the background
+    if flag('async'):
+        return submit_job('generate', options)
+    try:
+        session = get_db()
+        result = generate_schedule(session, **options)
+        prune_history(session)
         
-        response = {
-            'schedule': schedule,
-            'conflicts': conflicts
-        }
-        
-        return jsonify(response), 200
+        return jsonify(generation_response(result)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# POST /repair: keeps the still-valid entries of the latest run and re-places the rest
+@schedule_bp.route('/repair', methods=['POST'])
+def repair_schedule_route():
+    options, error = parse_repair_options()
+    if error:
+        return jsonify({'error': error}), 400
+    if flag('async'):
+        return submit_job('repair', options)
+    try:
+        session = get_db()
+        result = repair_schedule(session, **options)
+        if result is None:
+            return jsonify({'error': 'No schedule run to repair'}), 404
+        prune_history(session)
+        return jsonify(generation_response(result)), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-# GET /runs/<run_id>: returns all ScheduleEntry items for that run_id
+# GET /jobs/<job_id>: status and progress of a background generate/repair job
+@schedule_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.as_dict()), 200
+
+# GET /jobs/<job_id>/result: the finished job's response, as the synchronous endpoint returns it
+@schedule_bp.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status == 'failed':
+        return jsonify({'error': job.error, 'job': job.as_dict()}), 500
+    if job.status == 'cancelled':
+        return jsonify({'error': 'Job was cancelled', 'job': job.as_dict()}), 409
+    if not job.finished:
+        return jsonify({'error': 'Job has not finished', 'job': job.as_dict()}), 409
+    result = {**job.result, 'schedule': get_run_entries(job.result['run_id'])}
+    return jsonify(generation_response(result)), 200
+
+# POST /jobs/<job_id>/cancel: stops a queued or running job; a running solve saves nothing
+@schedule_bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = get_job_queue().cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status in ('succeeded', 'failed'):
+        return jsonify({'error': f'Job has already {job.status}', 'job': job.as_dict()}), 409
+    return jsonify(job.as_dict()), 202
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# GET /jobs/<job_id>/events: server-sent events of a background job
+#   progress: the job's status and progress whenever they change
+#   schedule: the finished run's entries, STREAM_CHUNK_SIZE per event
+#   done: the rest of the response, as /jobs/<job_id>/result returns it without 'schedule'
+#   error: the job failed or was cancelled
+@schedule_bp.route('/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    queue = get_job_queue()
+    if queue.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def events():
+        version = None
+        while True:
+            job = queue.wait(job_id, version, STREAM_KEEPALIVE)
+            if job is None:
+                yield sse_event('error', {'error': 'Job not found'})
+                return
+            if job.version == version:
+                yield ': keep-alive\n\n'
+                continue
+            version = job.version
+            yield sse_event('progress', job.as_dict())
+            if job.finished:
+                break
+        if job.status != 'succeeded':
+            yield sse_event('error', {'error': job.error or f'Job was {job.status}'})
+            return
+        # Read and sent a chunk at a time, the whole schedule is never in memory
+        for chunk in iter_run_entries(job.result['run_id'], STREAM_CHUNK_SIZE):
+            yield sse_event('schedule', {'entries': [format_entry(entry) for entry in chunk]})
+        done = format_generation_result({**job.result, 'schedule': []})
+        del done['schedule']
+        yield sse_event('done', done)
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def parse_run_page_options():
+    """Get and validate the page and filters of GET /runs/<run_id> from the query string."""
+    limit = request.args.get('limit', RUN_PAGE_SIZE, type=int)
+    if not 1 <= limit <= RUN_PAGE_MAX:
+        return None, f"limit must be between 1 and {RUN_PAGE_MAX}"
+    after = request.args.get('after', 0, type=int)
+    filters = {}
+    for name in ('lecturer_id', 'room_id'):
+        value = request.args.get(name, type=int)
+        if value is not None:
+            filters[name] = value
+    day = request.args.get('day')
+    if day is not None:
+        day = day.capitalize()
+        if day not in DAYS:
+            return None, f"Invalid day. Must be one of: {', '.join(DAYS)}"
+        filters['day'] = day
+    return {'limit': limit, 'after': after, 'filters': filters}, None
+
+# GET /runs/<run_id>: the entries of a run, in id order, one page at a time
+#   ?limit= entries per page (default RUN_PAGE_SIZE), ?after= the next_after of the previous page
+#   ?lecturer_id=, ?room_id=, ?day= only return matching entries
+#   ?format=jsonl streams every matching entry instead, one JSON object per line
 @schedule_bp.route('/runs/<run_id>', methods=['GET'])
 def get_schedule_by_run(run_id):
-    entries = ScheduleEntry.query.filter_by(run_id=run_id).all()
-    # Use Pydantic model for serialization
-    result = [ScheduleEntryResponse.from_orm(entry).model_dump() for entry in entries]
-    return jsonify(result), 200
+    options, error = parse_run_page_options()
+    if error:
+        return jsonify({'error': error}), 400
+    filters = options['filters']
+
+    if request.args.get('format') == 'jsonl':
+        if db.session.get(ScheduleRun, run_id) is None:
+            return jsonify({'error': 'Run not found'}), 404
+
+        def lines():
+            for chunk in iter_run_entries(run_id, STREAM_CHUNK_SIZE, **filters):
+                yield ''.join(json.dumps(format_entry(entry)) + '\n' for entry in chunk)
+        return Response(stream_with_context(lines()), mimetype='application/x-ndjson')
+
+    entries, next_after = get_run_page(run_id, options['limit'], options['after'], **filters)
+    # The run is only looked up when the page is empty, a full page already proves it exists
+    if not entries and db.session.get(ScheduleRun, run_id) is None:
+        return jsonify({'error': 'Run not found'}), 404
+    return jsonify({
+        'run_id': run_id,
+        'entries': [format_entry(entry) for entry in entries],
+        'next_after': next_after
+    }), 200
 
-# GET /runs: returns a list of unique run_ids with their earliest created_at, ordered by date descending
+# GET /runs: returns the saved runs with their summary, most recent first
 @schedule_bp.route('/runs', methods=['GET'])
 def list_runs():
-    # Get unique run_ids and their earliest created_at
-    runs = db.session.query(
-        ScheduleEntry.run_id,
-        func.min(ScheduleEntry.created_at).label('created_at')
-    ).group_by(ScheduleEntry.run_id).order_by(func.min(ScheduleEntry.created_at).desc()).all()
+    # Reads schedule_runs through its created_at index, schedule_entries is not touched
+    runs = ScheduleRun.query.order_by(ScheduleRun.created_at.desc(), ScheduleRun.id.desc()).all()
     result = [
-        RunSummaryResponse(run_id=run_id, created_at=created_at).model_dump()
-        for run_id, created_at in runs
+        RunSummaryResponse(
+            run_id=run.id,
+            created_at=run.created_at,
+            solver=run.solver,
+            status=run.status,
+            entry_count=run.entry_count,
+            conflict_count=run.conflict_count,
+            duration_seconds=run.duration_seconds
+        ).model_dump()
+        for run in runs
     ]
     return jsonify(result), 200 
\ No newline at end of file
@@ -3,14 +3,23 @@ from pydantic.config import ConfigDict
 from typing import Dict, List, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from .timeslot import TimeslotResponse
+    from .timeslot import TimeslotSummary
+
+class LecturerSummary(BaseModel):
+    """A lecturer nested in a timeslot, without its timeslots, which would lead back to the timeslot."""
+    id: int
+    name: str
+    email: str
+    specialty: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
 
 class LecturerResponse(BaseModel):
     id: int
     name: str
     email: str
     specialty: Optional[str] = None
-    available_timeslots: List["TimeslotResponse"]
+    available_timeslots: List["TimeslotSummary"]
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -35,5 +44,5 @@ class LecturerUpdate(BaseModel):
     specialty: Optional[str] = None
     availability: Optional[Dict[str, List[str]]] = None
 
-from .timeslot import TimeslotResponse
+from .timeslot import TimeslotSummary
 LecturerResponse.model_rebuild() 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional
 from pydantic.config import ConfigDict
 
@@ -21,9 +21,16 @@ class ModuleUpdate(ModuleBase):
 
 class ModuleResponse(ModuleBase):
     id: int
+    program_level_id: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
 
+    @field_validator('program_level', mode='before')
+    @classmethod
+    def program_level_name(cls, value):
+        # The model holds the ProgramLevel relationship, the API uses its name
+        return getattr(value, 'name', value)
+
     @classmethod
     def from_orm(cls, obj):
         # Create a copy of the object to avoid modifying the original
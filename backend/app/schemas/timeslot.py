@@ -1,9 +1,10 @@
-from pydantic import BaseModel
+from datetime import time
+from pydantic import BaseModel, field_validator
 from typing import Optional, List, TYPE_CHECKING
 from pydantic.config import ConfigDict
 
 if TYPE_CHECKING:
-    from .lecturer import LecturerResponse
+    from .lecturer import LecturerSummary
 
 class TimeslotBase(BaseModel):
     day: Optional[str] = None
@@ -11,6 +12,12 @@ class TimeslotBase(BaseModel):
     end_time: Optional[str] = None
     is_weekend: Optional[bool] = None
 
+    @field_validator('start_time', 'end_time', mode='before')
+    @classmethod
+    def format_time(cls, value):
+        # The model stores datetime.time, the API uses HH:MM
+        return value.strftime("%H:%M") if isinstance(value, time) else value
+
 class TimeslotCreate(TimeslotBase):
     day: str
     start_time: str
@@ -20,11 +27,17 @@ class TimeslotCreate(TimeslotBase):
 class TimeslotUpdate(TimeslotBase):
     pass
 
+class TimeslotSummary(TimeslotBase):
+    """A timeslot nested in a lecturer, without its lecturers, which would lead back to the lecturer."""
+    id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
 class TimeslotResponse(TimeslotBase):
     id: int
-    available_lecturers: List["LecturerResponse"]
+    available_lecturers: List["LecturerSummary"]
 
     model_config = ConfigDict(from_attributes=True)
 
-from .lecturer import LecturerResponse
+from .lecturer import LecturerSummary
 TimeslotResponse.model_rebuild() 
\ No newline at end of file
@@ -0,0 +1,123 @@
+# Helpers shared by the CRUD routes
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.sql import operators
+from app import db
+
+# ?total= values of cursor pagination
+TOTAL_MODES = ('none', 'exact', 'estimate')
+
+
+def _sort_key(sort_column):
+    """(column, descending) of a get_sort_params sort column, which may be wrapped in desc()."""
+    descending = getattr(sort_column, 'modifier', None) is operators.desc_op
+    column = sort_column.element if descending else sort_column
+    # The table column itself, for its key, type and nullability
+    return column.expression, descending
+
+
+def encode_cursor(sort, value, row_id):
+    if isinstance(value, (date, time)):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort, column):
+    """The (value, id) of a cursor, or None if it is malformed or was issued for another sort order."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, value, row_id = json.loads(raw)
+        if cursor_sort != sort or not isinstance(row_id, int):
+            return None
+        python_type = column.type.python_type
+        if value is not None and python_type in (date, datetime, time):
+            value = python_type.fromisoformat(value)
+        return value, row_id
+    except (ValueError, TypeError, binascii.Error):
+        return None
+
+
+def estimate_count(query):
+    """
+    The planner's row estimate for query on PostgreSQL, from EXPLAIN without running it.
+    Returns None on other databases.
+    """
+    dialect = db.session.get_bind().dialect
+    if dialect.name != 'postgresql':
+        return None
+    statement = query.order_by(None).statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+    plan = db.session.execute(db.text(f'EXPLAIN (FORMAT JSON) {statement}')).scalar()
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def keyset_paginate(query, sort_column, id_column, per_page, cursor='', total='none'):
+    """
+    One page of query ordered by sort_column (as returned by get_sort_params) and then id.
+    It continues after the row the cursor points to. The page is a seek on a (sort column, id)
+    index, however deep it is, instead of the OFFSET scan and COUNT(*) of paginate(); the models
+    declare one such index per non-unique sort_by column of their list endpoint.
+    NULLs sort as the largest value.
+    total: 'none' (default), 'exact' for a COUNT(*), or 'estimate' for the planner's row
+    estimate, which falls back to the exact count where the database offers none.
+    Returns ((items, pagination), None) or (None, error message).
+    """
+    if total not in TOTAL_MODES:
+        return None, f"Invalid total. Must be one of: {', '.join(TOTAL_MODES)}"
+    column, descending = _sort_key(sort_column)
+    sort = f"{column}:{'desc' if descending else 'asc'}"
+
+    page_query = query.order_by(None)
+    if cursor:
+        position = decode_cursor(cursor, sort, column)
+        if position is None:
+            return None, "Invalid cursor"
+        value, row_id = position
+        if value is None:
+            after = and_(column.is_(None), id_column < row_id if descending else id_column > row_id)
+            if descending:
+                after = or_(after, column.isnot(None))
+        elif descending:
+            after = tuple_(column, id_column) < (value, row_id)
+        else:
+            after = tuple_(column, id_column) > (value, row_id)
+            if column.nullable:
+                after = or_(after, column.is_(None))
+        page_query = page_query.filter(after)
+
+    if descending:
+        order = [column.desc().nulls_first() if column.nullable else column.desc(), id_column.desc()]
+    else:
+        order = [column.asc().nulls_last() if column.nullable else column.asc(), id_column.asc()]
+    rows = page_query.order_by(*order).limit(per_page + 1).all()
+    has_next = len(rows) > per_page
+    items = rows[:per_page]
+
+    pagination = {
+        "per_page": per_page,
+        "has_next": has_next,
+        "next_cursor": encode_cursor(sort, getattr(items[-1], column.key), getattr(items[-1], id_column.key))
+                       if has_next else None
+    }
+    if total != 'none':
+        count = estimate_count(query) if total == 'estimate' else None
+        pagination["total_estimated"] = count is not None
+        pagination["total"] = count if count is not None else query.order_by(None).count()
+    return (items, pagination), None
+
+
+def cursor_page(args, query, sort_column, id_column, per_page, key, serialize):
+    """
+    The response data of a list endpoint's cursor page: {key: [serialize(item), ...], 'pagination': ...}.
+    Cursor pagination is opted into with ?cursor= (empty for the first page, then the next_cursor
+    of the previous one); ?total=exact|estimate adds a row count. See keyset_paginate.
+    Returns (data, None) or (None, error message).
+    """
+    result, error = keyset_paginate(query, sort_column, id_column, per_page, args['cursor'], args.get('total', 'none'))
+    if error:
+        return None, error
+    items, pagination = result
+    return {key: [serialize(item) for item in items], "pagination": pagination}, None
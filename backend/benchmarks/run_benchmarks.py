@@ -0,0 +1,75 @@
+"""
+Benchmarks every solver strategy over the instance ladder in scheduler_engine.benchmark and
+compares wall time, peak memory, placement rate and conflict count against baseline.json.
+Exits with status 1 if any case regressed beyond the tolerances.
+
+    python benchmarks/run_benchmarks.py                      # compare against the baseline
+    python benchmarks/run_benchmarks.py --sizes small,medium # only part of the ladder
+    python benchmarks/run_benchmarks.py --update-baseline    # record a new baseline
+
+Timings depend on the machine: record the baseline on the machine that runs the comparison.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler_engine.benchmark import LADDER, compare_results, run_benchmarks
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', help=f"comma-separated sizes from: {', '.join(s['name'] for s in LADDER)}")
+    parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic instances')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='write the results into the baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative increase of time, memory and conflicts')
+    parser.add_argument('--placement-tolerance', type=float, default=0.01,
+                        help='allowed absolute drop of the placement rate')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args()
+
+    sizes = args.sizes.split(',') if args.sizes else None
+    unknown = set(sizes or ()) - {s['name'] for s in LADDER}
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(sorted(unknown))}")
+
+    def progress(key, metrics):
+        print(f"{key:<70} {metrics['seconds']:>8.3f}s {metrics['peak_mb']:>8.1f}MB "
+              f"{metrics['placement_rate']:>7.2%} placed ({metrics['placed']}/{metrics['placeable_hours']} of the bound) "
+              f"{metrics['conflicts']:>8} conflicts", flush=True)
+
+    results = run_benchmarks(sizes, seed=args.seed, progress=progress)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'Baseline written to {args.baseline}')
+        return 0
+
+    regressions = compare_results(results, baseline, args.tolerance, args.placement_tolerance)
+    for message in regressions:
+        print(f'REGRESSION {message}')
+    if not regressions:
+        print(f'No regressions against {args.baseline}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
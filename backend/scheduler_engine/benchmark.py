@@ -0,0 +1,120 @@
+# Solver benchmarks over synthetic instances of increasing size
+import time
+import tracemalloc
+from scheduler_engine.conflicts import ConflictReport
+from scheduler_engine.presolve import presolve
+from scheduler_engine.solvers import get_solver
+from scheduler_engine.synthetic import generate_instance, problem_from_instance
+
+# Instance sizes, from a single programme up to a faculty. Lecturers are the scarce resource
+# (six slots a day, available in 40% of them, 6-12 hours a week, one room per 15 modules), so
+# every size stays below its presolve bound and placement differs between strategies.
+LADDER = [
+    {'name': 'small', 'lecturers': 10, 'modules': 40, 'rooms': 3},
+    {'name': 'medium', 'lecturers': 40, 'modules': 150, 'rooms': 10},
+    {'name': 'large', 'lecturers': 160, 'modules': 600, 'rooms': 40},
+    {'name': 'faculty', 'lecturers': 400, 'modules': 1500, 'rooms': 100},
+]
+
+# Instance parameters shared by every size of the ladder
+INSTANCE_DEFAULTS = {'slots_per_day': 6, 'availability': 0.4, 'max_weekly_hours': (6, 12)}
+
+# Strategies benchmarked on every size up to max_size (all sizes if absent)
+STRATEGIES = [
+    {'solver': 'greedy', 'ordering': 'db'},
+    {'solver': 'greedy', 'ordering': 'largest_first'},
+    {'solver': 'greedy', 'ordering': 'most_constrained'},
+    {'solver': 'lns', 'ordering': 'most_constrained', 'time_limit': 2, 'seed': 0},
+    {'solver': 'cpsat', 'ordering': 'most_constrained', 'time_limit': 10, 'seed': 0, 'threads': 1,
+     'max_size': 'medium'},
+]
+
+# Times below this are dominated by noise and never count as a regression
+MIN_SECONDS = 0.05
+
+
+def strategy_name(strategy):
+    options = ','.join(f'{k}={v}' for k, v in strategy.items() if k not in ('solver', 'max_size'))
+    return f"{strategy['solver']}[{options}]"
+
+
+def instance_for(size, seed=0):
+    params = dict(INSTANCE_DEFAULTS, **{k: v for k, v in size.items() if k != 'name'})
+    return problem_from_instance(generate_instance(seed=seed, **params))
+
+
+def run_case(problem, strategy):
+    """
+    Solves the problem once for timing and once under tracemalloc for memory, so tracing
+    overhead does not distort wall time. Returns the metrics of the timed run.
+    """
+    options = {k: v for k, v in strategy.items() if k not in ('solver', 'max_size')}
+
+    conflicts = ConflictReport()
+    started = time.perf_counter()
+    result = get_solver(strategy['solver'], **options).solve(problem, conflicts)
+    seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        get_solver(strategy['solver'], **options).solve(problem, ConflictReport())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    hours = problem.total_hours
+    return {
+        'seconds': round(seconds, 4),
+        'peak_mb': round(peak / 2 ** 20, 2),
+        'placed': len(result.assignments),
+        'hours': hours,
+        'placement_rate': round(len(result.assignments) / hours, 4) if hours else 1.0,
+        'conflicts': conflicts.total,
+    }
+
+
+def run_benchmarks(sizes=None, strategies=None, seed=0, progress=None):
+    """
+    Runs every strategy on every size of the ladder (or the named sizes).
+    Returns {'<size>/<strategy>': metrics}, each with the instance's presolve bound as
+    'placeable_hours' so a placement rate can be read against what is reachable; progress, if given, is called with each key and its metrics.
+    """
+    ladder = [s for s in LADDER if sizes is None or s['name'] in sizes]
+    order = [s['name'] for s in LADDER]
+    results = {}
+    for size in ladder:
+        problem = instance_for(size, seed)
+        placeable_hours = presolve(problem).placeable_hours
+        for strategy in strategies or STRATEGIES:
+            max_size = strategy.get('max_size')
+            if max_size and order.index(size['name']) > order.index(max_size):
+                continue
+            key = f"{size['name']}/{strategy_name(strategy)}"
+            results[key] = dict(run_case(problem, strategy), placeable_hours=placeable_hours)
+            if progress:
+                progress(key, results[key])
+    return results
+
+
+def compare_results(results, baseline, tolerance=0.25, placement_tolerance=0.01):
+    """
+    Lists regressions of results against a baseline of the same shape:
+      - seconds, peak_mb or conflicts more than `tolerance` (relative) above the baseline
+      - placement_rate more than `placement_tolerance` (absolute) below the baseline
+    Cases missing from either side are ignored. Returns a list of human-readable messages.
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric in ('seconds', 'peak_mb', 'conflicts'):
+            if metric == 'seconds' and max(current[metric], previous[metric]) < MIN_SECONDS:
+                continue
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f'{key}: {metric} {previous[metric]} -> {current[metric]}')
+        if current['placement_rate'] < previous['placement_rate'] - placement_tolerance:
+            regressions.append(
+                f"{key}: placement_rate {previous['placement_rate']} -> {current['placement_rate']}"
+            )
+    return regressions
@@ -0,0 +1,48 @@
+# Cooperative cancellation and deadlines for scheduler runs
+import time
+
+
+class Cancelled(Exception):
+    """Raised by generate_schedule / repair_schedule when their CancelToken was cancelled."""
+
+
+class CancelToken:
+    """
+    Stop signal shared by a run and whoever controls it. cancel() may be called from any thread;
+    max_seconds, if given, stops the run that many seconds after the token was created
+    (or after set_deadline is called).
+
+    Solvers check `stopped` in their main loops and return the best schedule they have so far.
+    The check is an attribute read, plus one time.monotonic() call when there is a deadline.
+    reason is None while running, then 'cancelled' or 'timeout'.
+    """
+
+    def __init__(self, max_seconds=None):
+        self.deadline = None
+        self.reason = None
+        if max_seconds is not None:
+            self.set_deadline(max_seconds)
+
+    def set_deadline(self, max_seconds):
+        """Stops the run max_seconds from now."""
+        self.deadline = time.monotonic() + max_seconds
+
+    def cancel(self):
+        if self.reason is None:
+            self.reason = 'cancelled'
+
+    @property
+    def cancelled(self):
+        return self.reason == 'cancelled'
+
+    @property
+    def stopped(self):
+        if self.reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.reason = 'timeout'
+        return self.reason is not None
+
+    def remaining(self):
+        """Seconds left until the deadline, None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
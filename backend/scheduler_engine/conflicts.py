@@ -0,0 +1,67 @@
+# Conflict reporting for the scheduler engine
+from collections import Counter
+
+# Which id a conflict type is attributed to when aggregating
+CONFLICT_ENTITY_KEYS = {
+    'lecturer_unavailable': 'lecturer_id',
+    'room_over_capacity': 'room_id',
+    'lecturer_overlap': 'lecturer_id',
+}
+
+
+class ConflictReport:
+    """
+    Collects conflicts as counters keyed by (type, entity_id), so memory grows with the number
+    of distinct problems rather than with the size of the search space.
+    The per-conflict dicts are only kept when detail=True.
+    """
+
+    def __init__(self, detail=False):
+        self.detail = detail
+        self.counts = Counter()
+        self.details = []
+
+    def add(self, conflict):
+        """Record a single conflict dict."""
+        conflict_type = conflict['type']
+        self.counts[(conflict_type, conflict[CONFLICT_ENTITY_KEYS[conflict_type]])] += 1
+        if self.detail:
+            self.details.append(conflict)
+
+    def add_counts(self, conflict_type, entity_ids, counts):
+        """Record pre-aggregated counts, e.g. one entry per lecturer from a NumPy row sum."""
+        for entity_id, count in zip(entity_ids, counts):
+            if count:
+                self.counts[(conflict_type, entity_id)] += int(count)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        if self.detail:
+            self.details.extend(other.details)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def by_type(self):
+        totals = Counter()
+        for (conflict_type, _), count in self.counts.items():
+            totals[conflict_type] += count
+        return dict(totals)
+
+    def top_offenders(self, limit=10):
+        return [
+            {
+                'type': conflict_type,
+                CONFLICT_ENTITY_KEYS[conflict_type]: entity_id,
+                'count': count
+            }
+            for (conflict_type, entity_id), count in self.counts.most_common(limit)
+        ]
+
+    def summary(self, limit=10):
+        return {
+            'total': self.total,
+            'by_type': self.by_type(),
+            'top_offenders': self.top_offenders(limit)
+        }
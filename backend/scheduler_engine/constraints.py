@@ -1,27 +1,34 @@
 # Constraints for the scheduler engine
+# Lecturers, modules, rooms and timeslots are passed as positions in the problem's lists.
 
-def is_timeslot_available(lecturer, timeslot, current_schedule):
+def is_timeslot_available(lecturer_idx, timeslot_idx, state):
     """
-    Returns False if the lecturer is already booked at that timeslot in the current_schedule.
-    current_schedule: list of dicts or objects with keys: lecturer, timeslot
+    Returns False if the lecturer is already booked at that timeslot, or one overlapping it, in the schedule state.
+    state: ScheduleState holding the assignments made so far
     """
-    for assignment in current_schedule:
-        if assignment['lecturer']['id'] == lecturer['id'] and assignment['timeslot']['id'] == timeslot['id']:
-            return False
-    return True
+    return not state.is_lecturer_booked(lecturer_idx, timeslot_idx)
 
-def is_room_available(room, timeslot, current_schedule):
+def is_room_available(room_idx, timeslot_idx, state):
     """
-    Returns False if the room is already booked at that timeslot in the current_schedule.
-    current_schedule: list of dicts or objects with keys: room, timeslot
+    Returns False if the room is already booked at that timeslot, or one overlapping it, in the schedule state.
+    state: ScheduleState holding the assignments made so far
     """
-    for assignment in current_schedule:
-        if assignment['room']['id'] == room['id'] and assignment['timeslot']['id'] == timeslot['id']:
-            return False
-    return True
+    return not state.is_room_booked(room_idx, timeslot_idx)
 
-def is_valid_assignment(lecturer, module, room, timeslot, current_schedule):
+def has_lecturer_capacity(lecturer_idx, state):
+    """
+    Returns False if the lecturer has reached their max_weekly_hours in the schedule state.
+    """
+    return state.matrices.lecturer_load[lecturer_idx] < state.matrices.max_hours[lecturer_idx]
+
+def is_module_complete(module_idx, hours_needed, state):
+    """
+    Returns True if the module already has hours_needed hours placed in the schedule state.
+    """
+    return state.module_hours[module_idx] >= hours_needed
+
+def is_valid_assignment(lecturer_idx, module_idx, room_idx, timeslot_idx, state):
     """
     Returns True only if both the lecturer and room are available at the timeslot.
     """
-    return is_timeslot_available(lecturer, timeslot, current_schedule) and is_room_available(room, timeslot, current_schedule)
+    return is_timeslot_available(lecturer_idx, timeslot_idx, state) and is_room_available(room_idx, timeslot_idx, state)
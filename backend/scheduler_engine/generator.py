@@ -1,14 +1,21 @@
-from app.models.lecturer import Lecturer
-from app.models.module import Module
-from app.models.room import Room
 from app.models.timeslot import Timeslot
 from app.models.schedule_entry import ScheduleEntry
+from app.models.schedule_run import ScheduleRun
 from app import db
-from scheduler_engine.constraints import is_valid_assignment
+from scheduler_engine.cancellation import Cancelled, CancelToken
+from scheduler_engine.conflicts import ConflictReport
+from scheduler_engine.loader import load_problem
+from scheduler_engine.solvers import get_solver
+from scheduler_engine.history import latest_run
+from scheduler_engine.presolve import presolve
+from scheduler_engine.stats import RunStats
+from scheduler_engine.repair import partition_assignments
+from scheduler_engine.solvers.base import SolveResult
+from scheduler_engine.solvers.greedy import GreedySolver
+import time
 import uuid
 from datetime import datetime
-from collections import defaultdict
-from sqlalchemy.orm import joinedload
+from sqlalchemy import insert
 
 def convert_time_to_str(time_obj):
     """Convert datetime.time to string in HH:MM format"""
@@ -22,182 +29,381 @@ def convert_datetime_to_str(dt_obj):
         return dt_obj.isoformat()
     return str(dt_obj)
 
-def generate_schedule(session):
+def _run_entries_query(run_id, lecturer_id=None, room_id=None, day=None):
     """
-    Generates a schedule by assigning each module to a lecturer, room, and timeslot without conflicts.
-    Saves results as ScheduleEntry objects in the DB.
-    Returns a dict with 'schedule' (list of saved entries) and 'conflicts' (list of conflict dicts).
+    Column query of a run's entries joined to their timeslot, optionally filtered by lecturer,
+    room or day; no ORM objects are built.
     """
-    # Clear previous schedule batch
-    session.query(ScheduleEntry).delete()
-    session.commit()
+    query = (db.session.query(
+                ScheduleEntry.id,
+                ScheduleEntry.module_id,
+                ScheduleEntry.lecturer_id,
+                ScheduleEntry.room_id,
+                ScheduleEntry.timeslot_id,
+                ScheduleEntry.run_id,
+                ScheduleEntry.created_at,
+                Timeslot.day,
+                Timeslot.start_time,
+                Timeslot.end_time
+            )
+            .join(Timeslot, ScheduleEntry.timeslot_id == Timeslot.id)
+            .filter(ScheduleEntry.run_id == run_id))
+    if lecturer_id is not None:
+        query = query.filter(ScheduleEntry.lecturer_id == lecturer_id)
+    if room_id is not None:
+        query = query.filter(ScheduleEntry.room_id == room_id)
+    if day is not None:
+        query = query.filter(Timeslot.day == day)
+    return query
 
-    # Assign a new run_id and created_at for this batch
-    run_id = str(uuid.uuid4())
-    created_at = datetime.utcnow()
+def _row_dict(entry):
+    return {
+        'id': entry.id,
+        'module_id': entry.module_id,
+        'lecturer_id': entry.lecturer_id,
+        'room_id': entry.room_id,
+        'timeslot_id': entry.timeslot_id,
+        'day': entry.day,
+        'start_time': convert_time_to_str(entry.start_time),
+        'end_time': convert_time_to_str(entry.end_time),
+        'run_id': entry.run_id,
+        'created_at': convert_datetime_to_str(entry.created_at)
+    }
+
+def get_run_entries(run_id, **filters):
+    """
+    Returns the entries of a run as plain dicts, with day and times from their timeslot.
+    filters: lecturer_id, room_id and/or day, as for get_run_page.
+    """
+    return [_row_dict(entry) for entry in _run_entries_query(run_id, **filters).all()]
+
+def get_run_page(run_id, limit, after=0, **filters):
+    """
+    One page of a run's entries in id order, starting after the entry id `after`.
+    A single query seeks to `after` through the (run_id, id) index, so every page costs the
+    same however deep it is. filters: lecturer_id, room_id and/or day.
+    Returns (entries, next_after); next_after is the `after` of the next page, None on the last one.
+    """
+    rows = (_run_entries_query(run_id, **filters)
+            .filter(ScheduleEntry.id > after)
+            .order_by(ScheduleEntry.id)
+            .limit(limit + 1)
+            .all())
+    next_after = rows[limit - 1].id if len(rows) > limit else None
+    return [_row_dict(row) for row in rows[:limit]], next_after
+
+def iter_run_entries(run_id, chunk_size=500, **filters):
+    """
+    Yields the entries of a run as lists of at most chunk_size get_run_entries dicts, in id order,
+    one get_run_page query per chunk, so memory stays at one chunk however large the run is.
+    """
+    after = 0
+    while after is not None:
+        entries, after = get_run_page(run_id, chunk_size, after, **filters)
+        if entries:
+            yield entries
+
+def _entry_dict(entry_id, key, timeslot, run_id, created_at):
+    module_id, lecturer_id, room_id, timeslot_id = key
+    return {
+        'id': entry_id,
+        'module_id': module_id,
+        'lecturer_id': lecturer_id,
+        'room_id': room_id,
+        'timeslot_id': timeslot_id,
+        'day': timeslot['day'],
+        'start_time': timeslot['start_time'],
+        'end_time': timeslot['end_time'],
+        'run_id': run_id,
+        'created_at': created_at
+    }
 
-    # Get and convert modules to simple dicts
-    modules = []
-    for m in Module.query.all():
-        modules.append({
-            'id': m.id,
-            'name': m.name,
-            'code': m.code,
-            'weekly_hours': float(m.weekly_hours),
-            'expected_students': m.expected_students,
-            'program_level': m.program_level.name if m.program_level else None,
-            'description': m.description
-        })
-
-    # Get and convert rooms to simple dicts
-    rooms = []
-    for r in Room.query.all():
-        rooms.append({
-            'id': r.id,
-            'name': r.name,
-            'capacity': r.capacity
-        })
-
-    # Get and convert timeslots to simple dicts
-    timeslots = []
-    for t in Timeslot.query.filter_by(is_weekend=False).all():
-        timeslots.append({
-            'id': t.id,
-            'day': t.day,
-            'start_time': convert_time_to_str(t.start_time),
-            'end_time': convert_time_to_str(t.end_time),
-            'is_weekend': t.is_weekend
-        })
-
-    # Get lecturers and their available timeslots
-    lecturers = []
-    lecturer_timeslot_map = {}  # Map lecturer_id to list of timeslot_ids
-    for l in Lecturer.query.all():
-        lecturer_dict = {
-            'id': l.id,
-            'name': l.name,
-            'email': l.email,
-            'specialty': l.specialty,
-            'max_weekly_hours': l.max_weekly_hours
+def save_entries(session, problem, assignments, run_id, created_at):
+    """
+    Bulk-inserts assignments as ScheduleEntry rows of the run through the Core table, without
+    building ORM objects. A single executemany INSERT ... RETURNING id is sent (batched into multi-row statements by
+    SQLAlchemy), and the saved entries are returned as get_run_entries dicts built from the
+    problem snapshot, so the caller needs no second round trip. Does not commit.
+    """
+    keys = problem.assignment_keys(assignments)
+    if not keys:
+        return []
+    rows = [
+        {
+            'module_id': module_id,
+            'lecturer_id': lecturer_id,
+            'room_id': room_id,
+            'timeslot_id': timeslot_id,
+            'run_id': run_id,
+            'created_at': created_at,
+            'updated_at': created_at
         }
-        lecturers.append(lecturer_dict)
-        # Store available timeslots separately to avoid circular references
-        lecturer_timeslot_map[l.id] = [ts.id for ts in l.available_timeslots]
-
-    schedule = []  # List of assignments
-    schedule_entries = []  # List of ScheduleEntry objects
-    conflicts = []  # List of conflict dicts
-    lecturer_timeslot_assignments = defaultdict(set)  # lecturer_id -> set of timeslot_id
-
-    # For each module, try to assign required weekly hours
-    for module in modules:
-        hours_needed = int(module['weekly_hours'])
-        assigned_hours = 0
-        for lecturer in lecturers:
-            for room in rooms:
-                for timeslot in timeslots:
-                    timeslot_id = timeslot['id']
-                    
-                    # Check if lecturer is available at this timeslot
-                    if timeslot_id not in lecturer_timeslot_map[lecturer['id']]:
-                        conflicts.append({
-                            "type": "lecturer_unavailable",
-                            "lecturer_id": lecturer['id'],
-                            "timeslot_id": timeslot_id,
-                            "module_id": module['id']
-                        })
-                        continue
-                        
-                    # Check if room has sufficient capacity
-                    if module['expected_students'] > room['capacity']:
-                        conflicts.append({
-                            "type": "room_over_capacity",
-                            "room_id": room['id'],
-                            "module_id": module['id'],
-                            "capacity": room['capacity'],
-                            "required": module['expected_students']
-                        })
-                        continue
-                        
-                    # Check if lecturer is already booked at this timeslot
-                    if timeslot_id in lecturer_timeslot_assignments[lecturer['id']]:
-                        conflicts.append({
-                            "type": "lecturer_overlap",
-                            "lecturer_id": lecturer['id'],
-                            "timeslot_id": timeslot_id,
-                            "module_id": module['id']
-                        })
-                        continue
-                        
-                    lecturer_assignments = [a for a in schedule if a['lecturer']['id'] == lecturer['id']]
-                    if len(lecturer_assignments) >= lecturer['max_weekly_hours']:
-                        continue
-                    module_assignments = [a for a in schedule if a['module']['id'] == module['id']]
-                    if len(module_assignments) >= hours_needed:
-                        break
-                    if is_valid_assignment(lecturer, module, room, timeslot, schedule):
-                        assignment = {
-                            'module': module,
-                            'lecturer': lecturer,
-                            'room': room,
-                            'timeslot': timeslot
-                        }
-                        schedule.append(assignment)
-                        # Create ScheduleEntry instance
-                        entry = ScheduleEntry(
-                            module_id=module['id'],
-                            lecturer_id=lecturer['id'],
-                            room_id=room['id'],
-                            timeslot_id=timeslot['id'],
-                            run_id=run_id,
-                            created_at=created_at
-                        )
-                        session.add(entry)
-                        schedule_entries.append(entry)
-                        lecturer_timeslot_assignments[lecturer['id']].add(timeslot_id)
-                        assigned_hours += 1
-                        if assigned_hours >= hours_needed:
-                            break
-                if assigned_hours >= hours_needed:
-                    break
-            if assigned_hours >= hours_needed:
-                break
-    session.commit()
-
-    # Get the entries for this run with their related timeslot information
-    entries = (ScheduleEntry.query
-              .filter_by(run_id=run_id)
-              .join(Timeslot)
-              .add_columns(
-                  ScheduleEntry.id,
-                  ScheduleEntry.module_id,
-                  ScheduleEntry.lecturer_id,
-                  ScheduleEntry.room_id,
-                  ScheduleEntry.timeslot_id,
-                  ScheduleEntry.run_id,
-                  ScheduleEntry.created_at,
-                  Timeslot.day,
-                  Timeslot.start_time,
-                  Timeslot.end_time
-              )
-              .all())
-
-    schedule_entries = []
-    for entry in entries:
-        schedule_entries.append({
-            'id': entry.id,
-            'module_id': entry.module_id,
-            'lecturer_id': entry.lecturer_id,
-            'room_id': entry.room_id,
-            'timeslot_id': entry.timeslot_id,
-            'day': entry.day,
-            'start_time': convert_time_to_str(entry.start_time),
-            'end_time': convert_time_to_str(entry.end_time),
-            'run_id': entry.run_id,
-            'created_at': convert_datetime_to_str(entry.created_at)
-        })
+        for module_id, lecturer_id, room_id, timeslot_id in keys
+    ]
+    table = ScheduleEntry.__table__
+    ids = session.scalars(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows).all()
+    timeslots = {t['id']: t for t in problem.timeslots}
+    created = convert_datetime_to_str(created_at)
+    return [_entry_dict(entry_id, key, timeslots[key[3]], run_id, created) for entry_id, key in zip(ids, keys)]
 
+def _save_run(session, problem, assignments, run_id, solver, status, conflicts, run_stats, started,
+              solver_stats=None, fingerprint=None, presolved=None):
+    """
+    Saves the run's entries and its ScheduleRun row in one transaction.
+    The stored stats cover every phase up to the insert; the commit is timed afterwards.
+    Returns the saved entries as get_run_entries dicts.
+    """
+    created_at = datetime.utcnow()
+    with run_stats.phase('save'):
+        schedule = save_entries(session, problem, assignments, run_id, created_at)
+    run_stats.add({'rows_written': len(schedule)})
+    session.add(ScheduleRun(
+        id=run_id,
+        created_at=created_at,
+        last_used_at=created_at,
+        solver=solver,
+        status=status,
+        entry_count=len(schedule),
+        conflict_count=conflicts.total,
+        duration_seconds=time.perf_counter() - started,
+        fingerprint=fingerprint,
+        summary={
+            'conflict_summary': conflicts.summary(),
+            'solver_stats': solver_stats,
+            'stats': run_stats.as_dict(),
+            'presolve': presolved
+        }
+    ))
+    with run_stats.phase('commit'):
+        session.commit()
+    return schedule
+
+def _timings(run_stats):
+    phases = run_stats.phases
     return {
-        'schedule': schedule_entries,
-        'conflicts': conflicts
+        'load': phases.get('load', 0.0),
+        'solve': phases.get('solve', 0.0),
+        'save': phases.get('save', 0.0) + phases.get('commit', 0.0)
+    }
+
+def _cached_result(run, run_stats):
+    """The generate_schedule result of an earlier run, read back from the DB."""
+    summary = run.summary or {}
+    with run_stats.phase('load_cached'):
+        schedule = get_run_entries(run.id)
+    response = {
+        'schedule': schedule,
+        'run_id': run.id,
+        'solver': run.solver,
+        'status': run.status,
+        'conflict_summary': summary.get('conflict_summary') or ConflictReport().summary(),
+        'timings': _timings(run_stats),
+        'cached': True
+    }
+    if summary.get('solver_stats'):
+        response['solver_stats'] = summary['solver_stats']
+    if summary.get('presolve'):
+        response['presolve'] = summary['presolve']
+    return response
+
+def _solve(problem, presolved, solver, solver_options, conflicts, progress=None, token=None):
+    """
+    Runs the solver on what presolve left of the problem. Skipped when no hour can be placed;
+    otherwise the unplaceable modules are left out and the assignments mapped back to the
+    full problem's positions. progress and token are handed to the solver.
+    """
+    presolved.record_conflicts(conflicts)
+    if presolved.placeable_hours == 0:
+        return SolveResult([], 'infeasible' if presolved.infeasible else 'complete')
+    scoped = presolved.scoped_problem()
+    instance = get_solver(solver, **solver_options)
+    instance.progress = progress
+    instance.token = token
+    result = instance.solve(scoped, conflicts)
+    if scoped is not problem:
+        result.assignments = problem.resolve_assignments(scoped.assignment_keys(result.assignments))
+        if result.status == 'complete':
+            result.status = 'partial'
+    return result
+
+def generate_schedule(session, conflict_detail=False, solver='greedy', use_cache=True,
+                      include_stats=False, progress=None, token=None, max_seconds=None, **solver_options):
+    """
+    Generates a schedule by assigning each module to a lecturer, room, and timeslot without conflicts.
+    solver picks the backend from scheduler_engine.solvers.SOLVERS; solver_options (e.g. time_limit,
+    ordering) are passed to its constructor.
+    Saves results as a new run: a ScheduleRun row plus ScheduleEntry rows written with a single
+    bulk insert (see save_entries). Earlier runs are kept; see history.prune_runs for retention.
+    Returns a dict with 'schedule' (list of saved entries), 'run_id', 'solver', 'status',
+    'conflict_summary' (totals and top offenders), 'timings' (seconds spent loading the problem,
+    solving and saving) and, if the solver reports any, 'solver_stats'.
+    The problem is presolved first (see presolve.presolve): when its bounds prove that not every
+    hour can be placed, 'presolve' lists the infeasibilities, modules no room can seat are left
+    out of the search and the solver is skipped if nothing can be placed at all.
+    When conflict_detail is True, 'conflicts' (list of conflict dicts) is included as well.
+    When include_stats is True, 'stats' holds the per-phase timings and the solver's counters
+    (see RunStats); they are stored with the run either way.
+    progress, if given, is called with an event dict as each phase starts (see RunStats) and
+    with the solver's progress events (see Solver.report) while solving.
+    token is a CancelToken the caller can cancel from another thread, which raises Cancelled
+    and saves nothing. max_seconds sets its deadline: once it passes, the solver stops and the
+    best schedule found so far is saved (status 'timeout' if construction was cut short).
+
+    Each run stores a fingerprint of the problem snapshot and solver options. With use_cache, if a
+    saved run has the same fingerprint, nothing is solved or written: that run is returned with
+    'cached': True. Runs only hold the conflict summary, so conflict_detail always solves again.
+    """
+    run_id = str(uuid.uuid4())
+    run_stats = RunStats(listener=progress)
+    token = token or CancelToken()
+    if max_seconds is not None:
+        token.set_deadline(max_seconds)
+
+    started = time.perf_counter()
+    with run_stats.phase('load'):
+        problem = load_problem(session)
+    with run_stats.phase('fingerprint'):
+        fingerprint = problem.fingerprint(solver=solver, **solver_options)
+    if use_cache and not conflict_detail:
+        cached = (session.query(ScheduleRun)
+                  .filter_by(fingerprint=fingerprint)
+                  .order_by(ScheduleRun.last_used_at.desc())
+                  .first())
+        if cached is not None:
+            # The returned run becomes the latest one, for repairs and retention
+            cached.last_used_at = datetime.utcnow()
+            session.commit()
+            response = _cached_result(cached, run_stats)
+            if include_stats:
+                response['stats'] = run_stats.as_dict()
+            return response
+    with run_stats.phase('presolve'):
+        presolved = presolve(problem)
+    conflicts = ConflictReport(detail=conflict_detail)
+    with run_stats.phase('solve'):
+        result = _solve(problem, presolved, solver, solver_options, conflicts, progress, token)
+    if token.cancelled:
+        raise Cancelled()
+    run_stats.add(result.counters)
+    presolve_summary = presolved.as_dict() if presolved.infeasible else None
+
+    # A run cut short by the deadline is not what these options give, so it is never reused
+    schedule = _save_run(session, problem, result.assignments, run_id, solver, result.status, conflicts,
+                         run_stats, started, solver_stats=result.stats,
+                         fingerprint=None if token.stopped else fingerprint, presolved=presolve_summary)
+
+    response = {
+        'schedule': schedule,
+        'run_id': run_id,
+        'solver': solver,
+        'status': result.status,
+        'conflict_summary': conflicts.summary(),
+        'timings': _timings(run_stats),
+        'cached': False
+    }
+    if result.stats:
+        response['solver_stats'] = result.stats
+    if presolve_summary:
+        response['presolve'] = presolve_summary
+    if conflict_detail:
+        response['conflicts'] = conflicts.details
+    if include_stats:
+        response['stats'] = run_stats.as_dict()
+    return response
+
+
+def _unchanged_repair(previous_run, run_stats, kept, status, conflicts, include_stats):
+    """The result of a repair that changes nothing: the previous run, with the current status and conflicts."""
+    response = _cached_result(previous_run, run_stats)
+    response['status'] = status
+    response['conflict_summary'] = conflicts.summary()
+    response['repair'] = {'previous_run_id': previous_run.id, 'kept': kept, 'removed': 0, 'added': 0}
+    if conflicts.detail:
+        response['conflicts'] = conflicts.details
+    if include_stats:
+        response['stats'] = run_stats.as_dict()
+    return response
+
+def repair_schedule(session, conflict_detail=False, include_stats=False, progress=None, token=None,
+                    max_seconds=None, **solver_options):
+    """
+    Incrementally repairs the latest run after lecturers, rooms, timeslots or modules changed.
+    Entries that are still valid are kept as they are; only invalid ones are dropped, and missing
+    hours are re-placed by a greedy pass over the modules short of hours, around the kept entries.
+    The result is saved as a new run and the previous run stays in the history. If nothing is
+    invalid and no missing hour could be placed, the previous run is returned as it is
+    ('cached': True).
+    Returns the same dict as generate_schedule plus 'repair' with previous_run_id, kept, removed
+    and added counts (and 'stats' with include_stats); progress, token and max_seconds are as for
+    generate_schedule.
+    Returns None if there is no run to repair.
+    """
+    previous_run = latest_run(session)
+    if previous_run is None:
+        return None
+    previous_run_id = previous_run.id
+
+    previous = (session.query(ScheduleEntry.module_id, ScheduleEntry.lecturer_id,
+                              ScheduleEntry.room_id, ScheduleEntry.timeslot_id)
+                .filter_by(run_id=previous_run_id)
+                .order_by(ScheduleEntry.id)
+                .all())
+    run_stats = RunStats(listener=progress)
+    token = token or CancelToken()
+    if max_seconds is not None:
+        token.set_deadline(max_seconds)
+    started = time.perf_counter()
+    with run_stats.phase('load'):
+        problem = load_problem(session)
+    with run_stats.phase('partition'):
+        kept, invalid = partition_assignments(problem, [tuple(row) for row in previous])
+
+    placed = [0] * len(problem.modules)
+    for assignment in kept:
+        placed[assignment.module] += 1
+    missing = [mi for mi, hours in enumerate(problem.hours) if placed[mi] < hours]
+    if not invalid and not missing:
+        # Every hour is placed on the current data, whatever the previous run reported
+        return _unchanged_repair(previous_run, run_stats, len(kept), 'complete',
+                                 ConflictReport(detail=conflict_detail), include_stats)
+
+    conflicts = ConflictReport(detail=conflict_detail)
+    with run_stats.phase('solve'):
+        greedy = GreedySolver(fixed=kept, modules=missing, **solver_options)
+        greedy.progress = progress
+        greedy.token = token
+        result = greedy.solve(problem, conflicts)
+    if token.cancelled:
+        raise Cancelled()
+    run_stats.add(result.counters)
+    kept_ids = {id(a) for a in kept}
+    added = [a for a in result.assignments if id(a) not in kept_ids]
+    if not invalid and not added:
+        # The missing hours still have no place: the previous run stands as it is
+        return _unchanged_repair(previous_run, run_stats, len(kept), result.status, conflicts, include_stats)
+
+    run_id = str(uuid.uuid4())
+    # Kept entries come first, in the order they had in the previous run
+    schedule = _save_run(session, problem, kept + added, run_id, GreedySolver.name, result.status,
+                         conflicts, run_stats, started)
+
+    response = {
+        'schedule': schedule,
+        'run_id': run_id,
+        'solver': GreedySolver.name,
+        'status': result.status,
+        'conflict_summary': conflicts.summary(),
+        'timings': _timings(run_stats),
+        'cached': False,
+        'repair': {
+            'previous_run_id': previous_run_id,
+            'kept': len(kept),
+            'removed': len(invalid),
+            'added': len(added)
+        }
     }
+    if conflict_detail:
+        response['conflicts'] = conflicts.details
+    if include_stats:
+        response['stats'] = run_stats.as_dict()
+    return response
@@ -0,0 +1,39 @@
+# Retention of schedule runs
+from sqlalchemy import delete, select
+from app.models.schedule_entry import ScheduleEntry
+from app.models.schedule_run import ScheduleRun
+
+DEFAULT_GC_BATCH_SIZE = 1000
+
+
+def latest_run(session):
+    """The most recently used ScheduleRun (generated, or returned by a cache hit), or None."""
+    return session.query(ScheduleRun).order_by(ScheduleRun.last_used_at.desc(), ScheduleRun.id.desc()).first()
+
+
+def prune_runs(session, keep, batch_size=DEFAULT_GC_BATCH_SIZE):
+    """
+    Deletes every run but the `keep` most recently used ones, together with their entries.
+    Entries are deleted batch_size rows at a time, each batch in its own transaction, so pruning
+    a large run never holds long locks on schedule_entries. keep=None keeps every run.
+    Returns the number of runs deleted.
+    """
+    if keep is None:
+        return 0
+    stale = session.scalars(
+        select(ScheduleRun.id)
+        .order_by(ScheduleRun.last_used_at.desc(), ScheduleRun.id.desc())
+        .offset(keep)
+    ).all()
+    for run_id in stale:
+        while True:
+            entry_ids = session.scalars(
+                select(ScheduleEntry.id).where(ScheduleEntry.run_id == run_id).limit(batch_size)
+            ).all()
+            if not entry_ids:
+                break
+            session.execute(delete(ScheduleEntry).where(ScheduleEntry.id.in_(entry_ids)))
+            session.commit()
+        session.execute(delete(ScheduleRun).where(ScheduleRun.id == run_id))
+        session.commit()
+    return len(stale)
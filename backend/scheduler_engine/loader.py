@@ -0,0 +1,64 @@
+# Problem snapshot loader for the scheduler engine
+from sqlalchemy import select
+from app.models.lecturer import Lecturer, lecturer_timeslot
+from app.models.module import Module
+from app.models.room import Room
+from app.models.timeslot import Timeslot
+from scheduler_engine.problem import Problem
+
+
+def _time_to_str(time_obj):
+    """datetime.time -> 'HH:MM'"""
+    if hasattr(time_obj, 'strftime'):
+        return time_obj.strftime('%H:%M')
+    return str(time_obj)
+
+
+def load_problem(session):
+    """
+    Loads modules, rooms, weekday timeslots and lecturer availability into a Problem snapshot.
+    Reads plain columns only, one query per table (availability comes straight from the
+    lecturer_timeslot table), so the number of round trips stays at five whatever the number
+    of lecturers or modules. Only the columns the solvers use are loaded; names, emails and
+    descriptions stay in the DB. The timeslot day and times loaded here are also what
+    generator.save_entries builds the returned entries from, without reading them back.
+    """
+    modules = [
+        {'id': row.id, 'weekly_hours': float(row.weekly_hours), 'expected_students': row.expected_students}
+        for row in session.execute(
+            select(Module.id, Module.weekly_hours, Module.expected_students).order_by(Module.id)
+        )
+    ]
+
+    rooms = [
+        {'id': row.id, 'capacity': row.capacity}
+        for row in session.execute(select(Room.id, Room.capacity).order_by(Room.id))
+    ]
+
+    timeslots = [
+        {
+            'id': row.id,
+            'day': row.day,
+            'start_time': _time_to_str(row.start_time),
+            'end_time': _time_to_str(row.end_time)
+        }
+        for row in session.execute(
+            select(Timeslot.id, Timeslot.day, Timeslot.start_time, Timeslot.end_time)
+            .where(Timeslot.is_weekend.is_(False))
+            .order_by(Timeslot.id)
+        )
+    ]
+
+    lecturers = [
+        {'id': row.id, 'max_weekly_hours': row.max_weekly_hours}
+        for row in session.execute(select(Lecturer.id, Lecturer.max_weekly_hours).order_by(Lecturer.id))
+    ]
+
+    # Availability for weekend slots stays in the map; ProblemMatrices ignores unknown slot ids
+    lecturer_timeslot_map = {l['id']: set() for l in lecturers}
+    for lecturer_id, timeslot_id in session.execute(
+        select(lecturer_timeslot.c.lecturer_id, lecturer_timeslot.c.timeslot_id)
+    ):
+        lecturer_timeslot_map.setdefault(lecturer_id, set()).add(timeslot_id)
+
+    return Problem(modules, lecturers, rooms, timeslots, lecturer_timeslot_map)
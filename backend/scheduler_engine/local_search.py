@@ -0,0 +1,254 @@
+# Large-neighbourhood search improvement phase for the scheduler engine
+import math
+import random
+import time
+import numpy as np
+from scheduler_engine.state import Assignment, ScheduleState
+from scheduler_engine.matrices import ProblemMatrices
+
+# Cost of one unplaced module hour; dominates the soft objective (empty seats)
+UNPLACED_WEIGHT = 1000
+# Largest number of assignments removed by a single destroy step
+MAX_DESTROY = 4
+# Bookings sampled when looking for one an unplaced module could take over
+TARGET_SAMPLES = 8
+# Least seconds between two progress reports
+PROGRESS_INTERVAL = 0.5
+
+
+class _Pool:
+    """Set with O(1) add, discard and uniform random choice."""
+
+    __slots__ = ('items', '_index')
+
+    def __init__(self):
+        self.items = []
+        self._index = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self._index
+
+    def add(self, item):
+        if item not in self._index:
+            self._index[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
+        position = self._index.pop(item, None)
+        if position is None:
+            return
+        last = self.items.pop()
+        if position < len(self.items):
+            self.items[position] = last
+            self._index[last] = position
+
+    def choice(self, rng):
+        return self.items[rng.randrange(len(self.items))]
+
+
+class LocalSearch:
+    """
+    Improves a constructed schedule by repeatedly destroying a few assignments and repairing
+    the schedule, accepting worse solutions with simulated-annealing probability.
+
+    Cost = UNPLACED_WEIGHT * unplaced hours + empty seats (room capacity - expected students).
+    The cost, the placed assignments, the modules with missing hours and, per slot, the
+    lecturers free to teach in it are kept up to date on every add/remove, so a move only
+    touches the modules it destroys or targets and is evaluated by its delta alone.
+    Every add/remove since the best schedule was found is logged, and undone at the end
+    instead of copying the schedule on each improvement.
+    progress, if given, is called with placed, hours and best_cost keywords when the best
+    schedule improves, at most every PROGRESS_INTERVAL seconds.
+    """
+
+    def __init__(self, problem, assignments, seed=None, initial_temperature=10.0, cooling=0.999, progress=None):
+        self.problem = problem
+        self.progress = progress
+        self.rng = random.Random(seed)
+        self.temperature = initial_temperature
+        self.cooling = cooling
+        self.matrices = ProblemMatrices.from_problem(problem)
+        self.state = ScheduleState(self.matrices, len(problem.modules))
+        self.cost = UNPLACED_WEIGHT * problem.total_hours
+        self.iterations = 0
+        self.accepted = 0
+        self.placements = 0
+        self.placed = _Pool()
+        self.missing = _Pool()
+        for mi, hours in enumerate(problem.hours):
+            if hours > 0:
+                self.missing.add(mi)
+        # free_lecturers[t]: lecturers available at slot t, not booked over it and under max hours
+        self.free_lecturers = [_Pool() for _ in problem.timeslots]
+        for li, ti in np.argwhere(self.matrices.availability & (self.matrices.max_hours > 0)[:, None]):
+            self.free_lecturers[ti].add(int(li))
+        self._log = []
+        for assignment in assignments:
+            self._add(assignment)
+        self._log.clear()
+
+    def _waste(self, assignment):
+        return int(self.matrices.capacity[assignment.room]) - self.problem.students[assignment.module]
+
+    def _is_free(self, li, ti):
+        matrices = self.matrices
+        return (matrices.availability[li, ti] and not matrices.lecturer_blocked[li, ti]
+                and matrices.lecturer_load[li] < matrices.max_hours[li])
+
+    def _add(self, assignment):
+        self.state.add(assignment)
+        self.placed.add(assignment)
+        if self.state.module_hours[assignment.module] >= self.problem.hours[assignment.module]:
+            self.missing.discard(assignment.module)
+        self.cost += self._waste(assignment) - UNPLACED_WEIGHT
+        li = assignment.lecturer
+        if self.matrices.lecturer_load[li] >= self.matrices.max_hours[li]:
+            for pool in self.free_lecturers:
+                pool.discard(li)
+        else:
+            for tj in self.matrices.clashes[assignment.timeslot]:
+                self.free_lecturers[tj].discard(li)
+        self._log.append((True, assignment))
+
+    def _remove(self, assignment):
+        self.state.remove(assignment)
+        self.placed.discard(assignment)
+        self.missing.add(assignment.module)
+        self.cost += UNPLACED_WEIGHT - self._waste(assignment)
+        li = assignment.lecturer
+        # Back under max hours frees every slot; otherwise only the ones this booking blocked
+        slots = (range(len(self.free_lecturers))
+                 if self.matrices.lecturer_load[li] == self.matrices.max_hours[li] - 1
+                 else self.matrices.clashes[assignment.timeslot])
+        for tj in slots:
+            if self._is_free(li, tj):
+                self.free_lecturers[tj].add(li)
+        self._log.append((False, assignment))
+
+    def _undo(self, mark):
+        """Undoes the adds and removes logged after position mark."""
+        while len(self._log) > mark:
+            added, assignment = self._log.pop()
+            if added:
+                self._remove(assignment)
+            else:
+                self._add(assignment)
+            self._log.pop()
+
+    def missing_modules(self):
+        """Positions of the modules with hours still to place."""
+        return sorted(self.missing.items)
+
+    def _destroy(self):
+        """
+        Removes a small neighbourhood of assignments. Returns them and the unplaced module the
+        move targets, if any, which _repair places first.
+        """
+        if not self.placed:
+            return [], None
+        if self.missing and self.rng.random() < 0.5:
+            # Free a booking an unplaced module could take over: a room that seats it
+            module_idx = self.missing.choice(self.rng)
+            students = self.problem.students[module_idx]
+            for _ in range(TARGET_SAMPLES):
+                blocking = self.placed.choice(self.rng)
+                if blocking.module != module_idx and self.matrices.capacity[blocking.room] >= students:
+                    self._remove(blocking)
+                    return [blocking], module_idx
+        victims = self.rng.sample(self.placed.items, min(len(self.placed), self.rng.randint(1, MAX_DESTROY)))
+        for assignment in victims:
+            self._remove(assignment)
+        return victims, None
+
+    def _repair(self, removed, target=None):
+        """
+        Re-places the missing hours of the target module, then of the modules the destroy step
+        took hours from. Returns the new assignments.
+        """
+        modules = list(dict.fromkeys(a.module for a in removed))
+        self.rng.shuffle(modules)
+        if target is not None:
+            modules.insert(0, target)
+        added = []
+        for mi in modules:
+            if mi in self.missing:
+                self._place(mi, added)
+        return added
+
+    def _place(self, mi, added):
+        """
+        Places a module's missing hours, walking the slots from a random one: each takes the
+        smallest free room that seats the module and a random free lecturer, if it has both.
+        """
+        hours_needed = self.problem.hours[mi]
+        students = self.problem.students[mi]
+        slot_count = len(self.free_lecturers)
+        start = self.rng.randrange(slot_count) if slot_count else 0
+        for k in range(slot_count):
+            if self.state.module_hours[mi] >= hours_needed:
+                return
+            ti = (start + k) % slot_count
+            lecturers = self.free_lecturers[ti]
+            if not lecturers:
+                continue
+            ri = self.matrices.free_rooms.best_fit(ti, students)
+            if ri is None:
+                continue
+            assignment = Assignment(mi, lecturers.choice(self.rng), ri, ti)
+            self._add(assignment)
+            self.placements += 1
+            added.append(assignment)
+
+    @property
+    def counters(self):
+        """Work done so far; rejected moves are undone and count as backtracks."""
+        return {
+            'lns_iterations': self.iterations,
+            'lns_accepted': self.accepted,
+            'backtracks': self.iterations - self.accepted,
+            'placements': self.placements,
+        }
+
+    def run(self, time_limit, max_stall=2000, token=None):
+        """
+        Searches until time_limit seconds pass, max_stall iterations bring no improvement or
+        the CancelToken stops. Returns the best list of assignments found.
+        """
+        deadline = time.monotonic() + time_limit
+        best_cost = self.cost
+        self._log.clear()
+        stall = 0
+        # At this cost every placeable hour is placed with no empty seats, nothing left to improve
+        floor = UNPLACED_WEIGHT * (self.problem.total_hours - self.problem.placeable_hours)
+        next_report = 0.0
+        while best_cost > floor and stall < max_stall and time.monotonic() < deadline:
+            if token is not None and token.stopped:
+                break
+            self.iterations += 1
+            cost_before = self.cost
+            mark = len(self._log)
+            removed, target = self._destroy()
+            added = self._repair(removed, target)
+            delta = self.cost - cost_before
+
+            if delta <= 0 or self.rng.random() < math.exp(-delta / self.temperature):
+                self.accepted += 1
+            else:
+                self._undo(mark)
+
+            if self.cost < best_cost:
+                best_cost = self.cost
+                self._log.clear()
+                stall = 0
+                if self.progress and time.monotonic() >= next_report:
+                    self.progress(placed=len(self.placed), hours=self.problem.total_hours, best_cost=best_cost)
+                    next_report = time.monotonic() + PROGRESS_INTERVAL
+            else:
+                stall += 1
+            self.temperature = max(self.temperature * self.cooling, 0.01)
+        # Back to the best schedule found
+        self._undo(0)
+        return self.state.assignments
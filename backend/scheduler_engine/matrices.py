@@ -0,0 +1,91 @@
+# Dense NumPy encoding of a scheduling problem
+import numpy as np
+from scheduler_engine.rooms import FreeRoomIndex
+
+
+class ProblemMatrices:
+    """
+    Encodes lecturers, rooms and timeslots as dense arrays indexed by position:
+      - availability: bool[lecturer, timeslot], True if the lecturer can teach in the slot
+      - lecturer_blocked: int[lecturer, timeslot], bookings of the lecturer overlapping the slot
+      - room_blocked: int[room, timeslot], bookings of the room overlapping the slot
+      - lecturer_busy / room_busy: bool views of the above, True while anything overlaps the slot
+      - capacity: int[room]
+      - free_rooms: FreeRoomIndex of the rooms not blocked in each slot, sorted by capacity
+      - max_hours / lecturer_load: int[lecturer]
+    overlap is a bool[timeslot, timeslot] matrix (see OverlapIndex.matrix); without it a slot
+    only clashes with itself. The *_index dicts map DB ids to array positions.
+    """
+
+    @classmethod
+    def from_problem(cls, problem):
+        return cls(problem.lecturers, problem.rooms, problem.timeslots, problem.lecturer_timeslot_map,
+                   overlap=problem.overlaps.matrix(problem.timeslots))
+
+    def __init__(self, lecturers, rooms, timeslots, lecturer_timeslot_map, overlap=None):
+        self.lecturers = lecturers
+        self.rooms = rooms
+        self.timeslots = timeslots
+        self.lecturer_index = {l['id']: i for i, l in enumerate(lecturers)}
+        self.room_index = {r['id']: i for i, r in enumerate(rooms)}
+        self.timeslot_index = {t['id']: i for i, t in enumerate(timeslots)}
+
+        self.availability = np.zeros((len(lecturers), len(timeslots)), dtype=bool)
+        for lecturer_id, timeslot_ids in lecturer_timeslot_map.items():
+            row = self.lecturer_index.get(lecturer_id)
+            if row is None:
+                continue
+            cols = [self.timeslot_index[t] for t in timeslot_ids if t in self.timeslot_index]
+            self.availability[row, cols] = True
+
+        self.capacity = np.array([r['capacity'] for r in rooms], dtype=np.int64)
+        self.max_hours = np.array([l['max_weekly_hours'] for l in lecturers], dtype=np.int64)
+        self.lecturer_load = np.zeros(len(lecturers), dtype=np.int64)
+        self.overlap = overlap if overlap is not None else np.eye(len(timeslots), dtype=bool)
+        # Positions of each slot and the slots overlapping it, for per-booking updates
+        self.clashes = [np.flatnonzero(row).tolist() for row in self.overlap]
+        self.lecturer_blocked = np.zeros((len(lecturers), len(timeslots)), dtype=np.int32)
+        self.room_blocked = np.zeros((len(rooms), len(timeslots)), dtype=np.int32)
+        self.free_rooms = FreeRoomIndex(self.capacity, len(timeslots))
+
+    @property
+    def lecturer_busy(self):
+        return self.lecturer_blocked > 0
+
+    @property
+    def room_busy(self):
+        return self.room_blocked > 0
+
+    def room_fits(self, module):
+        """bool[room]: True where the room can seat the module's expected students."""
+        return self.capacity >= module['expected_students']
+
+    def candidate_masks(self, module):
+        """
+        Returns (lecturer_free, room_free):
+          lecturer_free: bool[lecturer, timeslot], available, not booked and under max hours
+          room_free: bool[room, timeslot], large enough and not booked
+        A triple (l, r, t) is feasible iff lecturer_free[l, t] and room_free[r, t].
+        """
+        lecturer_free = self.availability & ~self.lecturer_busy
+        lecturer_free &= (self.lecturer_load < self.max_hours)[:, None]
+        room_free = ~self.room_busy & self.room_fits(module)[:, None]
+        return lecturer_free, room_free
+
+    def book(self, lecturer_idx, room_idx, timeslot_idx):
+        """Books the slot, blocking it and every slot overlapping it for the lecturer and room."""
+        # A handful of scalar updates: a booking touches only its own and overlapping slots
+        for tj in self.clashes[timeslot_idx]:
+            self.lecturer_blocked[lecturer_idx, tj] += 1
+            self.room_blocked[room_idx, tj] += 1
+            if self.room_blocked[room_idx, tj] == 1:
+                self.free_rooms.remove(tj, room_idx, int(self.capacity[room_idx]))
+        self.lecturer_load[lecturer_idx] += 1
+
+    def release(self, lecturer_idx, room_idx, timeslot_idx):
+        for tj in self.clashes[timeslot_idx]:
+            self.lecturer_blocked[lecturer_idx, tj] -= 1
+            self.room_blocked[room_idx, tj] -= 1
+            if self.room_blocked[room_idx, tj] == 0:
+                self.free_rooms.add(tj, room_idx, int(self.capacity[room_idx]))
+        self.lecturer_load[lecturer_idx] -= 1
@@ -0,0 +1,204 @@
+# Presolve analysis: proves a problem cannot be fully scheduled before any search runs
+import numpy as np
+from ortools.graph.python import max_flow
+from scheduler_engine.matrices import ProblemMatrices
+
+# Ids listed per entity kind in an infeasibility
+ENTITY_LIMIT = 10
+
+
+class PresolveReport:
+    """
+    Outcome of presolve(problem):
+      - total_hours: hours the problem asks for
+      - placeable_hours: upper bound on the hours any schedule can place
+      - unplaceable_modules: positions of the modules no room can seat
+      - infeasibilities: dicts with a 'type', the hour counts behind it ('required', 'available',
+        'shortfall') and the ids of the entities responsible
+    Every bound is proven: no schedule places more than placeable_hours.
+    """
+
+    def __init__(self, problem, placeable_hours, unplaceable_modules, infeasibilities):
+        self.problem = problem
+        self.total_hours = problem.total_hours
+        self.placeable_hours = placeable_hours
+        self.unplaceable_modules = unplaceable_modules
+        self.infeasibilities = infeasibilities
+
+    @property
+    def infeasible(self):
+        return self.placeable_hours < self.total_hours
+
+    def scoped_problem(self):
+        """
+        The part of the problem left to search: the unplaceable modules are dropped and
+        hours_bound is set, so solvers can stop once they reach the bound.
+        """
+        problem = self.problem
+        if self.unplaceable_modules:
+            excluded = {problem.modules[mi]['id'] for mi in self.unplaceable_modules}
+            problem = problem.subproblem(
+                {m['id'] for m in problem.modules} - excluded,
+                {l['id'] for l in problem.lecturers},
+                {r['id'] for r in problem.rooms},
+            )
+        problem.hours_bound = self.placeable_hours
+        return problem
+
+    def record_conflicts(self, conflicts):
+        """Reports every room as too small for each unplaceable module, as GreedySolver would."""
+        rooms = self.problem.rooms
+        for mi in self.unplaceable_modules:
+            module = self.problem.modules[mi]
+            if not conflicts.detail:
+                conflicts.add_counts('room_over_capacity', [r['id'] for r in rooms], [1] * len(rooms))
+                continue
+            for room in rooms:
+                conflicts.add({
+                    "type": "room_over_capacity",
+                    "room_id": room['id'],
+                    "module_id": module['id'],
+                    "capacity": room['capacity'],
+                    "required": module['expected_students']
+                })
+
+    def as_dict(self):
+        return {
+            'infeasible': self.infeasible,
+            'total_hours': self.total_hours,
+            'placeable_hours': self.placeable_hours,
+            'infeasibilities': self.infeasibilities,
+        }
+
+
+def _ids(entities, positions):
+    return [entities[i]['id'] for i in positions[:ENTITY_LIMIT]]
+
+
+def _shortfall(kind, required, available, **entities):
+    return {'type': kind, 'required': int(required), 'available': int(available),
+            'shortfall': int(required - available), **entities}
+
+
+def presolve(problem):
+    """
+    Bounds the hours a problem can place, in a few milliseconds, without searching:
+      - modules larger than every room can never be placed
+      - total lecturer supply: each lecturer teaches at most min(max_weekly_hours, available slots)
+      - room supply by size: modules needing at least c seats only fit the rooms of capacity >= c,
+        each of which offers one hour per timeslot
+      - a max-flow through lecturer -> available slot -> room -> module size class, which combines
+        all of the above with who is available when; without overlapping timeslots it is exact
+    Overlapping timeslots are treated as independent, which can only loosen the bound.
+    Returns a PresolveReport.
+    """
+    matrices = ProblemMatrices.from_problem(problem)
+    hours = np.array(problem.hours, dtype=np.int64)
+    students = np.array(problem.students, dtype=np.int64)
+    capacity = matrices.capacity
+    slot_count = len(problem.timeslots)
+    infeasibilities = []
+
+    largest_room = int(capacity.max()) if capacity.size else None
+    seated = students <= largest_room if capacity.size else np.zeros(len(hours), dtype=bool)
+    unplaceable = np.flatnonzero(~seated & (hours > 0))
+    if unplaceable.size:
+        lost = int(hours[unplaceable].sum())
+        infeasibilities.append({
+            'type': 'module_exceeds_rooms', 'required': lost, 'available': 0, 'shortfall': lost,
+            'largest_room': largest_room, 'module_count': int(unplaceable.size),
+            'module_ids': _ids(problem.modules, unplaceable[np.argsort(-students[unplaceable], kind='stable')]),
+        })
+    placeable = seated & (hours > 0)
+    demand = int(hours[placeable].sum())
+
+    # Lecturer supply
+    lecturer_supply = np.minimum(np.maximum(matrices.max_hours, 0), matrices.availability.sum(axis=1))
+    if demand > lecturer_supply.sum():
+        infeasibilities.append(_shortfall('lecturer_hours_short', demand, lecturer_supply.sum(),
+                                          lecturer_count=len(problem.lecturers)))
+
+    # Room supply by size class: levels are the distinct room capacities, ascending; a module
+    # needs the first level that seats it and can use any room at that level or above
+    levels = np.unique(capacity)
+    module_level = np.searchsorted(levels, students)
+    room_level = np.searchsorted(levels, capacity)
+    level_demand = np.bincount(module_level[placeable], weights=hours[placeable], minlength=len(levels)).astype(np.int64)
+    level_supply = np.bincount(room_level, minlength=len(levels)).astype(np.int64) * slot_count
+    # Demand and supply of each level and everything larger, largest first
+    demand_above = np.cumsum(level_demand[::-1])[::-1]
+    supply_above = np.cumsum(level_supply[::-1])[::-1]
+    if len(levels) and (demand_above > supply_above).any():
+        worst = int(np.argmax(demand_above - supply_above))
+        needing = np.flatnonzero(placeable & (module_level >= worst))
+        fitting = np.flatnonzero(room_level >= worst)
+        infeasibilities.append(_shortfall(
+            'room_hours_short', demand_above[worst], supply_above[worst],
+            capacity=int(levels[worst]),
+            module_ids=_ids(problem.modules, needing[np.argsort(-students[needing], kind='stable')]),
+            room_ids=_ids(problem.rooms, fitting)
+        ))
+
+    placeable_hours, limiting = _flow_bound(matrices, level_demand, levels)
+    # Only reported when it proves more than the counting bounds above
+    counted = max((i['shortfall'] for i in infeasibilities if i['type'] != 'module_exceeds_rooms'), default=0)
+    if demand - placeable_hours > counted:
+        infeasibilities.append(_shortfall('assignment_bound', demand, placeable_hours, **limiting))
+
+    return PresolveReport(problem, placeable_hours, [int(mi) for mi in unplaceable], infeasibilities)
+
+
+def _flow_bound(matrices, level_demand, levels):
+    """
+    Max-flow source -> lecturer (max hours) -> timeslot (1 per available slot) -> room (1 per slot)
+    -> size level -> smaller levels ... -> sink (hours of the modules needing that level).
+    Returns the flow and the lecturers, timeslots and rooms on the sink side of the minimum cut,
+    i.e. the saturated resources that limit it.
+    """
+    lecturer_count, slot_count = matrices.availability.shape
+    room_count = len(matrices.capacity)
+    source, sink = 0, 1
+    lecturer_node = 2
+    slot_node = lecturer_node + lecturer_count
+    room_node = slot_node + slot_count
+    level_node = room_node + room_count
+
+    if not room_count or not slot_count or not level_demand.sum():
+        return 0, {}
+    unbounded = int(level_demand.sum())
+    lecturers, slots = np.nonzero(matrices.availability)
+    slot_room = np.indices((slot_count, room_count)).reshape(2, -1)
+    room_level = np.searchsorted(levels, matrices.capacity)
+
+    tails = np.concatenate([
+        np.full(lecturer_count, source), lecturer_node + lecturers, slot_node + slot_room[0],
+        room_node + np.arange(room_count), level_node + np.arange(1, len(levels)),
+        level_node + np.arange(len(levels)),
+    ])
+    heads = np.concatenate([
+        lecturer_node + np.arange(lecturer_count), slot_node + slots, room_node + slot_room[1],
+        level_node + room_level, level_node + np.arange(len(levels) - 1),
+        np.full(len(levels), sink),
+    ])
+    capacities = np.concatenate([
+        np.maximum(matrices.max_hours, 0), np.ones(len(lecturers) + slot_room.shape[1], dtype=np.int64),
+        np.full(room_count, slot_count), np.full(len(levels) - 1, unbounded), level_demand,
+    ])
+    flow = max_flow.SimpleMaxFlow()
+    flow.add_arcs_with_capacity(tails.astype(np.int32), heads.astype(np.int32), capacities.astype(np.int64))
+    if flow.solve(source, sink) != flow.OPTIMAL:
+        return unbounded, {}
+
+    source_side = np.zeros(level_node + len(levels), dtype=bool)
+    source_side[flow.get_source_side_min_cut()] = True
+    lecturer_side = source_side[lecturer_node:slot_node]
+    slot_side = source_side[slot_node:room_node]
+    room_side = source_side[room_node:level_node]
+    # Cut arcs: lecturer hours used up, slots every reaching lecturer fills, rooms booked in every reaching slot
+    limiting = {
+        'lecturer_ids': _ids(matrices.lecturers, np.flatnonzero(~lecturer_side & (matrices.max_hours > 0))),
+        'timeslot_ids': _ids(matrices.timeslots,
+                             np.flatnonzero(~slot_side & matrices.availability[lecturer_side].any(axis=0))),
+        'room_ids': _ids(matrices.rooms, np.flatnonzero(~room_side)) if slot_side.any() else [],
+    }
+    return int(flow.optimal_flow()), limiting
@@ -0,0 +1,96 @@
+# Problem snapshot for the scheduler engine
+import hashlib
+import json
+from scheduler_engine.state import Assignment
+from scheduler_engine.timeslots import OverlapIndex
+
+
+class Problem:
+    """
+    Everything a solver needs, detached from the DB session:
+      - modules, lecturers, rooms, timeslots: lists of plain dicts
+      - lecturer_timeslot_map: lecturer_id -> set of available timeslot_ids
+    Solvers refer to entities by their position in these lists (dense ids); hours and
+    students hold each module's hours_needed and expected_students by position.
+    """
+
+    def __init__(self, modules, lecturers, rooms, timeslots, lecturer_timeslot_map):
+        self.modules = modules
+        self.lecturers = lecturers
+        self.rooms = rooms
+        self.timeslots = timeslots
+        self.lecturer_timeslot_map = lecturer_timeslot_map
+        self.module_index = {m['id']: i for i, m in enumerate(modules)}
+        self.hours = [self.hours_needed(m) for m in modules]
+        self.students = [m['expected_students'] for m in modules]
+        # Upper bound on placeable hours proven by presolve, None if not analysed
+        self.hours_bound = None
+        self._overlaps = None
+
+    @property
+    def overlaps(self):
+        """OverlapIndex over the timeslots, built on first use and reused for the whole run."""
+        if self._overlaps is None:
+            self._overlaps = OverlapIndex(self.timeslots)
+        return self._overlaps
+
+    def fingerprint(self, **options):
+        """
+        SHA-256 hex digest of everything that determines a solver's result: modules, lecturers,
+        rooms, timeslots, availability and the given solver options. Independent of list order,
+        so the same data gives the same fingerprint across requests and restarts.
+        """
+        payload = {
+            'modules': sorted([m['id'], m['weekly_hours'], m['expected_students']] for m in self.modules),
+            'lecturers': sorted([l['id'], l['max_weekly_hours']] for l in self.lecturers),
+            'rooms': sorted([r['id'], r['capacity']] for r in self.rooms),
+            'timeslots': sorted([t['id'], t.get('day'), t.get('start_time'), t.get('end_time')] for t in self.timeslots),
+            'availability': sorted([l, t] for l, slots in self.lecturer_timeslot_map.items() for t in slots),
+            'options': options,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def hours_needed(self, module):
+        return int(module['weekly_hours'])
+
+    @property
+    def total_hours(self):
+        return sum(self.hours)
+
+    @property
+    def placeable_hours(self):
+        """The most hours any schedule can place: total_hours unless presolve proved less."""
+        if self.hours_bound is None:
+            return self.total_hours
+        return min(self.hours_bound, self.total_hours)
+
+    def assignment_keys(self, assignments):
+        """
+        Maps assignments back to DB ids: (module_id, lecturer_id, room_id, timeslot_id) tuples,
+        which are also the picklable form passed between processes.
+        """
+        return [
+            (self.modules[a.module]['id'], self.lecturers[a.lecturer]['id'],
+             self.rooms[a.room]['id'], self.timeslots[a.timeslot]['id'])
+            for a in assignments
+        ]
+
+    def resolve_assignments(self, keys):
+        """Inverse of assignment_keys: Assignments on this problem's positions."""
+        lecturers = {l['id']: i for i, l in enumerate(self.lecturers)}
+        rooms = {r['id']: i for i, r in enumerate(self.rooms)}
+        timeslots = {t['id']: i for i, t in enumerate(self.timeslots)}
+        return [
+            Assignment(self.module_index[m], lecturers[l], rooms[r], timeslots[t])
+            for m, l, r, t in keys
+        ]
+
+    def subproblem(self, module_ids, lecturer_ids, room_ids):
+        """A Problem restricted to the given modules, lecturers and rooms, sharing all timeslots."""
+        return Problem(
+            [m for m in self.modules if m['id'] in module_ids],
+            [l for l in self.lecturers if l['id'] in lecturer_ids],
+            [r for r in self.rooms if r['id'] in room_ids],
+            self.timeslots,
+            {l: slots for l, slots in self.lecturer_timeslot_map.items() if l in lecturer_ids},
+        )
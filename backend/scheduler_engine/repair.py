@@ -0,0 +1,42 @@
+# Incremental repair of an existing schedule
+from scheduler_engine.constraints import (
+    is_valid_assignment,
+    has_lecturer_capacity,
+    is_module_complete,
+)
+from scheduler_engine.matrices import ProblemMatrices
+from scheduler_engine.state import Assignment, ScheduleState
+
+
+def partition_assignments(problem, keys):
+    """
+    Splits previously saved assignments into those still valid under the current problem and
+    those that must be re-placed.
+
+    keys: (module_id, lecturer_id, room_id, timeslot_id) tuples, in the order they were saved.
+    Returns (kept, invalid): kept is a list of Assignments on the problem's positions,
+    invalid the list of positions in keys that were dropped. An entry is dropped if any of its
+    entities is gone, the lecturer is no longer available, the room no longer seats the module,
+    or keeping it would exceed the lecturer's max_weekly_hours, the module's weekly_hours, or
+    double-book a lecturer or room.
+    """
+    matrices = ProblemMatrices.from_problem(problem)
+    state = ScheduleState(matrices, len(problem.modules))
+    invalid = []
+    for position, (module_id, lecturer_id, room_id, timeslot_id) in enumerate(keys):
+        mi = problem.module_index.get(module_id)
+        li = matrices.lecturer_index.get(lecturer_id)
+        ri = matrices.room_index.get(room_id)
+        ti = matrices.timeslot_index.get(timeslot_id)
+        if (
+            mi is None or li is None or ri is None or ti is None
+            or not matrices.availability[li, ti]
+            or matrices.capacity[ri] < problem.students[mi]
+            or not has_lecturer_capacity(li, state)
+            or is_module_complete(mi, problem.hours[mi], state)
+            or not is_valid_assignment(li, mi, ri, ti, state)
+        ):
+            invalid.append(position)
+            continue
+        state.add(Assignment(mi, li, ri, ti))
+    return state.assignments, invalid
@@ -0,0 +1,32 @@
+# Capacity-sorted free room index for the scheduler engine
+from bisect import bisect_left, insort
+
+
+class FreeRoomIndex:
+    """
+    For every timeslot position, the free rooms as a list of (capacity, room position) sorted by
+    capacity, so the smallest free room seating a module is found by bisection instead of
+    scanning every room. ProblemMatrices keeps it in sync as rooms are booked and released.
+    """
+
+    def __init__(self, capacity, timeslot_count):
+        rooms = sorted((int(c), ri) for ri, c in enumerate(capacity))
+        self._free = [list(rooms) for _ in range(timeslot_count)]
+
+    def best_fit(self, timeslot_idx, students):
+        """Position of the smallest free room with capacity >= students at the slot, or None."""
+        free = self._free[timeslot_idx]
+        k = bisect_left(free, (students, -1))
+        return free[k][1] if k < len(free) else None
+
+    def free_count(self, timeslot_idx):
+        return len(self._free[timeslot_idx])
+
+    def remove(self, timeslot_idx, room_idx, capacity):
+        free = self._free[timeslot_idx]
+        k = bisect_left(free, (capacity, room_idx))
+        if k < len(free) and free[k] == (capacity, room_idx):
+            del free[k]
+
+    def add(self, timeslot_idx, room_idx, capacity):
+        insort(self._free[timeslot_idx], (capacity, room_idx))
@@ -0,0 +1,19 @@
+from scheduler_engine.solvers.base import Solver, SolveResult
+from scheduler_engine.solvers.greedy import GreedySolver
+from scheduler_engine.solvers.cpsat import CpSatSolver
+from scheduler_engine.solvers.lns import LnsSolver
+from scheduler_engine.solvers.portfolio import PortfolioSolver
+
+# Solver name -> class, as accepted by generate_schedule(solver=...)
+SOLVERS = {
+    GreedySolver.name: GreedySolver,
+    CpSatSolver.name: CpSatSolver,
+    LnsSolver.name: LnsSolver,
+    PortfolioSolver.name: PortfolioSolver,
+}
+
+def get_solver(name, **options):
+    """Instantiate a registered solver by name, e.g. get_solver('cpsat', time_limit=30)."""
+    if name not in SOLVERS:
+        raise ValueError(f"Unknown solver '{name}'. Must be one of: {', '.join(SOLVERS)}")
+    return SOLVERS[name](**options)
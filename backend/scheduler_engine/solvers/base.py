@@ -0,0 +1,55 @@
+# Solver interface for the scheduler engine
+
+
+class SolveResult:
+    """
+    Outcome of a solver run.
+    assignments: list of Assignments (see scheduler_engine.state)
+    status: solver-specific status string, e.g. 'complete', 'partial', 'optimal', 'feasible'
+    stats: optional dict of solver-specific details, returned with the run
+    counters: dict of work done, e.g. candidate_evaluations, placements, backtracks; counted in
+              local variables during the search and reported once here (see RunStats)
+    """
+
+    def __init__(self, assignments, status, stats=None, counters=None):
+        self.assignments = assignments
+        self.status = status
+        self.stats = stats
+        self.counters = counters or {}
+
+
+class Solver:
+    """
+    Base class for schedule solvers.
+    Subclasses set name and implement solve(problem, conflicts) -> SolveResult.
+    time_limit is a wall-clock budget in seconds; None means no limit.
+    seed makes randomised solvers reproducible; deterministic solvers ignore it.
+    progress, if set, is called with {'type': 'progress', ...} events while solving, e.g. hours
+    placed so far or the best cost found; solvers throttle them so reporting stays cheap.
+    token, if set, is a CancelToken: solvers check stopped() in their main loops and return
+    the best schedule found so far, with status 'cancelled' or 'timeout' if construction was cut short.
+    """
+
+    name = None
+
+    def __init__(self, time_limit=None, seed=None):
+        self.time_limit = time_limit
+        self.seed = seed
+        self.progress = None
+        self.token = None
+
+    def stopped(self):
+        return self.token is not None and self.token.stopped
+
+    def time_budget(self, default):
+        """Seconds the solver may run: time_limit (or default), cut short by the token's deadline."""
+        budget = self.time_limit or default
+        remaining = self.token.remaining() if self.token is not None else None
+        return budget if remaining is None else min(budget, remaining)
+
+    def report(self, **fields):
+        if self.progress:
+            self.progress({'type': 'progress', 'solver': self.name, **fields})
+
+    def solve(self, problem, conflicts):
+        raise NotImplementedError
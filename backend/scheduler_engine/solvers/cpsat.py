@@ -0,0 +1,208 @@
+# Exact solver backed by OR-Tools CP-SAT
+import os
+import threading
+import time
+from collections import defaultdict
+import numpy as np
+from ortools.sat.python import cp_model
+from scheduler_engine.matrices import ProblemMatrices
+from scheduler_engine.ordering import DEFAULT_ORDERING
+from scheduler_engine.solvers.base import Solver, SolveResult
+from scheduler_engine.solvers.greedy import GreedySolver
+from scheduler_engine.state import Assignment, ScheduleState
+from scheduler_engine.stats import merge_counters
+
+DEFAULT_TIME_LIMIT = 30  # seconds
+# Seconds between two checks of the CancelToken while CP-SAT searches
+CANCEL_POLL_INTERVAL = 0.1
+
+
+class CpSatSolver(Solver):
+    """
+    Builds a constraint model from the problem snapshot and maximises the number of placed hours.
+
+    Any available lecturer can teach any module, and the rooms that seat a module are the k
+    largest for some k, so neither lecturers nor rooms are modelled one booking at a time:
+      held[m, t]: hours of module m held in slot t
+      busy[l, t]: lecturer l teaches in slot t (only where l is available)
+    linked by sum_l busy[l, t] == sum_m held[m, t] for every slot. Rooms are counted: the
+    modules that fit only the k largest rooms take at most k of them across each slot and the
+    slots overlapping it. Lecturer clashes cover overlapping slots too. Rooms and lecturers are
+    matched to the bookings of each slot afterwards, largest module into the smallest room that
+    seats it; that matching is exact unless slots overlap, when a booking left without a room
+    is dropped.
+
+    The greedy schedule is used as a solution hint, and returned as-is if CP-SAT finds nothing
+    better within the time budget, or without building a model if it already reaches
+    problem.placeable_hours. time_limit covers the whole solve: greedy, the model build and
+    the search, which only gets the time left. stats['model'] tells which of these happened:
+    'skipped', 'abandoned' (the budget ran out while building), 'no_solution' or 'solved'.
+    The search runs on threads cores, all available by default.
+    """
+
+    name = 'cpsat'
+
+    def __init__(self, time_limit=None, seed=None, ordering=DEFAULT_ORDERING, threads=None):
+        super().__init__(time_limit, seed)
+        self.ordering = ordering
+        self.threads = threads
+
+    def solve(self, problem, conflicts):
+        deadline = time.monotonic() + self.time_budget(DEFAULT_TIME_LIMIT)
+        construction = GreedySolver(ordering=self.ordering)
+        construction.progress = self.progress
+        construction.token = self.token
+        greedy = construction.solve(problem, conflicts)
+        if self.stopped():
+            return greedy
+        if len(greedy.assignments) >= problem.placeable_hours:
+            # Every hour is placed, or presolve proved nothing better exists
+            return SolveResult(greedy.assignments, 'optimal', {'model': 'skipped'}, counters=greedy.counters)
+
+        def abandoned():
+            return SolveResult(greedy.assignments, greedy.status, {'model': 'abandoned'}, counters=greedy.counters)
+
+        matrices = ProblemMatrices.from_problem(problem)
+        model = cp_model.CpModel()
+        held = {}
+        busy = {}
+        slots = np.flatnonzero(matrices.availability.any(axis=0))
+        overlapping = [[oj for oj in np.flatnonzero(row) if matrices.availability[:, oj].any()]
+                       for row in matrices.overlap]
+        # Number of rooms that seat each module: the largest ones, as capacities only go up
+        fits = [int(matrices.room_fits(module).sum()) for module in problem.modules]
+        levels = sorted({fits[mi] for mi in range(len(problem.modules)) if fits[mi] and problem.hours[mi] > 0})
+        level_of = {k: j for j, k in enumerate(levels)}
+        level_vars = defaultdict(list)
+
+        for mi in range(len(problem.modules)):
+            hours_needed = problem.hours[mi]
+            if hours_needed <= 0 or fits[mi] == 0:
+                continue
+            module_vars = []
+            for ti in slots:
+                var = model.NewIntVar(0, min(hours_needed, fits[mi]), f'held_{mi}_{ti}')
+                held[mi, ti] = var
+                level_vars[ti, level_of[fits[mi]]].append(var)
+                module_vars.append(var)
+            model.Add(cp_model.LinearExpr.Sum(module_vars) <= hours_needed)
+        if self.stopped() or time.monotonic() >= deadline:
+            return abandoned()
+
+        # rooms_used[t, j]: bookings in slot t of modules that fit only the levels[j] largest rooms
+        rooms_used = {}
+        for ti in slots:
+            previous = 0
+            for j, k in enumerate(levels):
+                rooms_used[ti, j] = model.NewIntVar(0, k, f'rooms_{ti}_{j}')
+                model.Add(rooms_used[ti, j] == previous + cp_model.LinearExpr.Sum(level_vars.get((ti, j), [])))
+                previous = rooms_used[ti, j]
+        for ti in slots:
+            if len(overlapping[ti]) > 1:
+                for j, k in enumerate(levels):
+                    model.Add(cp_model.LinearExpr.Sum([rooms_used[oj, j] for oj in overlapping[ti]]) <= k)
+
+        for li in range(len(problem.lecturers)):
+            lecturer_vars = []
+            for ti in np.flatnonzero(matrices.availability[li]):
+                busy[li, ti] = model.NewBoolVar(f'busy_{li}_{ti}')
+                lecturer_vars.append(busy[li, ti])
+            if lecturer_vars:
+                model.Add(cp_model.LinearExpr.Sum(lecturer_vars) <= int(matrices.max_hours[li]))
+        for (li, ti) in busy:
+            clashing = [busy[li, oj] for oj in overlapping[ti] if (li, oj) in busy]
+            if len(clashing) > 1:
+                model.AddAtMostOne(clashing)
+        for ti in slots:
+            lecturers = [busy[li, ti] for li in np.flatnonzero(matrices.availability[:, ti])]
+            booked = rooms_used[ti, len(levels) - 1] if levels else 0
+            model.Add(cp_model.LinearExpr.Sum(lecturers) == booked)
+
+        placed = cp_model.LinearExpr.Sum(list(held.values()))
+        if problem.hours_bound is not None:
+            model.Add(placed <= problem.placeable_hours)
+        model.Maximize(placed)
+
+        self._add_hints(model, greedy, held, busy, rooms_used, [level_of.get(k) for k in fits])
+        remaining = deadline - time.monotonic()
+        if self.stopped() or remaining <= 0:
+            return abandoned()
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = remaining
+        solver.parameters.num_workers = self.threads or os.cpu_count() or 1
+        if self.seed is not None:
+            solver.parameters.random_seed = self.seed
+        status = self._solve_model(solver, model)
+        counters = merge_counters(greedy.counters, {
+            'cpsat_variables': len(held) + len(busy) + len(rooms_used),
+            'cpsat_branches': solver.NumBranches(),
+            'cpsat_conflicts': solver.NumConflicts(),
+        })
+
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return SolveResult(greedy.assignments, greedy.status, {'model': 'no_solution'}, counters=counters)
+        assignments = self._extract(problem, solver, held, busy)
+        if len(assignments) < len(greedy.assignments):
+            return SolveResult(greedy.assignments, greedy.status, {'model': 'solved'}, counters=counters)
+        if status == cp_model.OPTIMAL and len(assignments) == solver.ObjectiveValue():
+            status_name = 'optimal'
+        else:
+            status_name = 'feasible'
+        return SolveResult(assignments, status_name, {'model': 'solved'}, counters=counters)
+
+    def _solve_model(self, solver, model):
+        """Solves the model; a watcher thread stops the search if the token is cancelled."""
+        if self.token is None:
+            return solver.Solve(model)
+        finished = threading.Event()
+
+        def watch():
+            while not finished.wait(CANCEL_POLL_INTERVAL):
+                if self.token.stopped:
+                    solver.StopSearch()
+                    return
+
+        watcher = threading.Thread(target=watch, daemon=True)
+        watcher.start()
+        try:
+            return solver.Solve(model)
+        finally:
+            finished.set()
+            watcher.join()
+
+    def _add_hints(self, model, greedy, held, busy, rooms_used, module_levels):
+        hours = defaultdict(int)
+        level_hours = defaultdict(int)
+        working = set()
+        for assignment in greedy.assignments:
+            hours[assignment.module, assignment.timeslot] += 1
+            level_hours[assignment.timeslot, module_levels[assignment.module]] += 1
+            working.add((assignment.lecturer, assignment.timeslot))
+        for key, var in held.items():
+            model.AddHint(var, hours.get(key, 0))
+        for key, var in busy.items():
+            model.AddHint(var, 1 if key in working else 0)
+        used = 0
+        for (ti, j), var in sorted(rooms_used.items()):
+            used = (used if j else 0) + level_hours.get((ti, j), 0)
+            model.AddHint(var, used)
+
+    def _extract(self, problem, solver, held, busy):
+        bookings = defaultdict(list)
+        working = defaultdict(list)
+        for (mi, ti), var in held.items():
+            bookings[ti].extend([mi] * solver.Value(var))
+        for (li, ti), var in busy.items():
+            if solver.Value(var):
+                working[ti].append(li)
+
+        state = ScheduleState(ProblemMatrices.from_problem(problem), len(problem.modules))
+        for ti, modules in bookings.items():
+            # Largest module first, into the smallest free room that seats it
+            modules.sort(key=lambda mi: problem.students[mi], reverse=True)
+            for mi, li in zip(modules, working[ti]):
+                ri = state.matrices.free_rooms.best_fit(ti, problem.students[mi])
+                if ri is not None:
+                    state.add(Assignment(mi, li, ri, ti))
+        return state.assignments
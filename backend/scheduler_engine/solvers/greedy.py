@@ -0,0 +1,140 @@
+# Greedy construction solver
+import numpy as np
+from scheduler_engine.constraints import (
+    is_valid_assignment,
+    has_lecturer_capacity,
+    is_module_complete,
+)
+from scheduler_engine.state import Assignment, ScheduleState
+from scheduler_engine.matrices import ProblemMatrices
+from scheduler_engine.ordering import DEFAULT_ORDERING, iter_modules, pick_room
+from scheduler_engine.solvers.base import Solver, SolveResult
+
+
+class _ConflictTotals:
+    """Summary-mode conflict counts of a greedy run, summed per lecturer / room and reported once."""
+
+    def __init__(self, matrices):
+        self.unavailable = np.zeros(len(matrices.lecturers), dtype=np.int64)
+        self.overlap = np.zeros(len(matrices.lecturers), dtype=np.int64)
+        self.too_small = np.zeros(len(matrices.rooms), dtype=np.int64)
+
+    def report_to(self, matrices, report):
+        lecturer_ids = [l['id'] for l in matrices.lecturers]
+        report.add_counts('lecturer_unavailable', lecturer_ids, self.unavailable)
+        report.add_counts('room_over_capacity', [r['id'] for r in matrices.rooms], self.too_small)
+        report.add_counts('lecturer_overlap', lecturer_ids, self.overlap)
+
+
+def _module_conflicts(matrices, module, busy_at_start, lecturers_tried, report, totals):
+    """
+    Records a module's conflicts from the problem matrices.
+    Only the first lecturers_tried lecturers are reported, mirroring the order the generator tries them in.
+    In summary mode the counts are summed into totals with NumPy; per-conflict dicts are only
+    built into the ConflictReport in detail mode.
+    """
+    if lecturers_tried == 0:
+        return
+    unavailable = ~matrices.availability[:lecturers_tried]
+    overlap = matrices.availability[:lecturers_tried] & busy_at_start[:lecturers_tried]
+    too_small = np.flatnonzero(~matrices.room_fits(module))
+
+    if not report.detail:
+        totals.unavailable[:lecturers_tried] += unavailable.sum(axis=1)
+        totals.too_small[too_small] += 1
+        totals.overlap[:lecturers_tried] += overlap.sum(axis=1)
+        return
+
+    lecturer_ids = [l['id'] for l in matrices.lecturers[:lecturers_tried]]
+    for li, ti in np.argwhere(unavailable):
+        report.add({
+            "type": "lecturer_unavailable",
+            "lecturer_id": lecturer_ids[li],
+            "timeslot_id": matrices.timeslots[ti]['id'],
+            "module_id": module['id']
+        })
+    for ri in too_small:
+        room = matrices.rooms[ri]
+        report.add({
+            "type": "room_over_capacity",
+            "room_id": room['id'],
+            "module_id": module['id'],
+            "capacity": room['capacity'],
+            "required": module['expected_students']
+        })
+    for li, ti in np.argwhere(overlap):
+        report.add({
+            "type": "lecturer_overlap",
+            "lecturer_id": lecturer_ids[li],
+            "timeslot_id": matrices.timeslots[ti]['id'],
+            "module_id": module['id']
+        })
+
+
+class GreedySolver(Solver):
+    """
+    Places each module's weekly hours in turn, taking the first feasible lecturer and slot.
+    Never revisits earlier placements.
+    ordering selects the module/room heuristic from scheduler_engine.ordering.MODULE_ORDERINGS.
+    fixed is a list of Assignments on the same problem, booked before construction starts and
+    kept as they are; modules, if given, limits construction to those module positions.
+    """
+
+    name = 'greedy'
+
+    def __init__(self, time_limit=None, seed=None, ordering=DEFAULT_ORDERING, fixed=None, modules=None):
+        super().__init__(time_limit, seed)
+        self.ordering = ordering
+        self.fixed = fixed or []
+        self.modules = modules
+
+    def solve(self, problem, conflicts):
+        matrices = ProblemMatrices.from_problem(problem)
+        # Assignments plus module/lecturer bookings; occupancy is kept in the matrices
+        state = ScheduleState(matrices, len(problem.modules))
+        for assignment in self.fixed:
+            state.add(assignment)
+
+        evaluations = 0
+        totals = _ConflictTotals(matrices)
+        # About a hundred progress events per run
+        modules_total = len(problem.modules) if self.modules is None else len(self.modules)
+        report_every = max(1, modules_total // 100)
+        # For each module, try to assign required weekly hours
+        for done, mi in enumerate(iter_modules(problem, matrices, self.ordering, self.modules), 1):
+            if self.stopped():
+                break
+            module = problem.modules[mi]
+            hours_needed = problem.hours[mi]
+            students = problem.students[mi]
+            busy_at_start = matrices.lecturer_busy.copy()
+            lecturer_free, room_free = matrices.candidate_masks(module)
+            lecturers_tried = 0
+            # Only lecturers with at least one free slot that some suitable room also has free
+            for li in np.flatnonzero((lecturer_free & room_free.any(axis=0)).any(axis=1)):
+                if is_module_complete(mi, hours_needed, state):
+                    break
+                lecturers_tried = li + 1
+                for ti in np.flatnonzero(lecturer_free[li]):
+                    evaluations += 1
+                    if not has_lecturer_capacity(li, state) or is_module_complete(mi, hours_needed, state):
+                        break
+                    ri = pick_room(matrices, students, ti, self.ordering)
+                    if ri is None or not is_valid_assignment(li, mi, ri, ti, state):
+                        continue
+                    state.add(Assignment(mi, li, ri, ti))
+            if not is_module_complete(mi, hours_needed, state):
+                lecturers_tried = len(problem.lecturers)
+            _module_conflicts(matrices, module, busy_at_start, lecturers_tried, conflicts, totals)
+            if done % report_every == 0:
+                self.report(modules_done=done, modules_total=modules_total, placed=len(state),
+                            hours=problem.total_hours)
+
+        if not conflicts.detail:
+            totals.report_to(matrices, conflicts)
+        if len(state) >= problem.total_hours:
+            status = 'complete'
+        else:
+            status = self.token.reason if self.stopped() else 'partial'
+        counters = {'candidate_evaluations': evaluations, 'placements': len(state) - len(self.fixed)}
+        return SolveResult(state.assignments, status, counters=counters)
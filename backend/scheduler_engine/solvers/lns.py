@@ -0,0 +1,33 @@
+# Greedy construction followed by a large-neighbourhood search improvement phase
+from scheduler_engine.local_search import LocalSearch
+from scheduler_engine.ordering import DEFAULT_ORDERING
+from scheduler_engine.solvers.base import Solver, SolveResult
+from scheduler_engine.solvers.greedy import GreedySolver
+from scheduler_engine.stats import merge_counters
+
+DEFAULT_TIME_LIMIT = 10  # seconds
+
+
+class LnsSolver(Solver):
+    """
+    Builds a schedule with GreedySolver, then spends up to time_limit seconds destroying and
+    repairing parts of it to place the remaining hours and reduce empty seats.
+    """
+
+    name = 'lns'
+
+    def __init__(self, time_limit=None, seed=None, ordering=DEFAULT_ORDERING):
+        super().__init__(time_limit, seed)
+        self.ordering = ordering
+
+    def solve(self, problem, conflicts):
+        greedy = GreedySolver(ordering=self.ordering)
+        greedy.progress = self.progress
+        greedy.token = self.token
+        construction = greedy.solve(problem, conflicts)
+        if self.stopped():
+            return construction
+        search = LocalSearch(problem, construction.assignments, seed=self.seed, progress=self.report)
+        assignments = search.run(self.time_budget(DEFAULT_TIME_LIMIT), token=self.token)
+        status = 'complete' if len(assignments) >= problem.total_hours else 'partial'
+        return SolveResult(assignments, status, counters=merge_counters(construction.counters, search.counters))
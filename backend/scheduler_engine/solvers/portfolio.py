@@ -0,0 +1,168 @@
+# Parallel portfolio of solver runs on a shared problem snapshot
+import multiprocessing
+import os
+import queue
+import time
+from scheduler_engine.cancellation import CancelToken
+from scheduler_engine.conflicts import ConflictReport
+from scheduler_engine.solvers.base import Solver, SolveResult
+
+DEFAULT_TIME_LIMIT = 30  # seconds
+# Seconds between two checks of the CancelToken while waiting for workers
+CANCEL_POLL_INTERVAL = 0.2
+# Workers stop this share of the time limit (at least RESULT_MARGIN_MIN seconds) before the
+# portfolio's deadline, so solvers that use their whole budget still hand their result back
+RESULT_MARGIN = 0.1
+RESULT_MARGIN_MIN = 0.5
+
+# Strategies tried first, in order; further workers run lns with other seeds
+BASE_STRATEGIES = [
+    {'solver': 'greedy', 'ordering': 'most_constrained'},
+    {'solver': 'lns', 'ordering': 'most_constrained'},
+    {'solver': 'cpsat', 'ordering': 'most_constrained'},
+    {'solver': 'greedy', 'ordering': 'largest_first'},
+    {'solver': 'lns', 'ordering': 'largest_first'},
+    {'solver': 'greedy', 'ordering': 'db'},
+]
+
+# Set in each worker process by _init_worker
+_worker_problem = None
+
+
+def _init_worker(problem):
+    global _worker_problem
+    _worker_problem = problem
+
+
+def _run_strategy(index, strategy, deadline, conflict_detail):
+    """
+    Runs one strategy in a worker process and returns a picklable summary of the outcome.
+    deadline is a time.monotonic() value, shared by processes on one machine; the solver stops
+    there with the best schedule it has, however long the worker took to start.
+    """
+    from scheduler_engine.solvers import get_solver
+
+    started = time.monotonic()
+    options = {k: v for k, v in strategy.items() if k != 'solver'}
+    conflicts = ConflictReport(detail=conflict_detail)
+    solver = get_solver(strategy['solver'], time_limit=max(deadline - started, 0.01), **options)
+    solver.token = CancelToken()
+    solver.token.deadline = deadline
+    result = solver.solve(_worker_problem, conflicts)
+    return {
+        'index': index,
+        'status': result.status,
+        'seconds': round(time.monotonic() - started, 3),
+        'assignments': _worker_problem.assignment_keys(result.assignments),
+        'conflicts': conflicts,
+        'counters': result.counters,
+    }
+
+
+def default_strategies(workers, seed=None):
+    """The first `workers` strategies, each with its own seed."""
+    base_seed = 0 if seed is None else seed
+    strategies = []
+    for i in range(workers):
+        if i < len(BASE_STRATEGIES):
+            strategy = dict(BASE_STRATEGIES[i])
+        else:
+            strategy = {'solver': 'lns', 'ordering': 'most_constrained'}
+        strategy['seed'] = base_seed + i
+        strategies.append(strategy)
+    return strategies
+
+
+class PortfolioSolver(Solver):
+    """
+    Runs several strategies on the same problem in a process pool and keeps the best result:
+    most placed hours, then fewest empty seats. Workers stop with their best schedule shortly
+    before time_limit passes (see RESULT_MARGIN). The pool is terminated as soon as a worker
+    places problem.placeable_hours, time_limit passes or the token stops, whichever comes first.
+    workers defaults to the number of CPU cores; strategies defaults to default_strategies().
+    ordering, if given, overrides the ordering of every strategy.
+    """
+
+    name = 'portfolio'
+
+    def __init__(self, time_limit=None, seed=None, workers=None, strategies=None, ordering=None):
+        super().__init__(time_limit, seed)
+        self.workers = workers or os.cpu_count() or 1
+        self.strategies = strategies or default_strategies(self.workers, seed)
+        if ordering is not None:
+            self.strategies = [dict(s, ordering=ordering) for s in self.strategies]
+
+    def solve(self, problem, conflicts):
+        time_limit = self.time_budget(DEFAULT_TIME_LIMIT)
+        deadline = time.monotonic() + time_limit
+        worker_deadline = deadline - max(RESULT_MARGIN * time_limit, min(RESULT_MARGIN_MIN, time_limit / 2))
+        total_hours = problem.total_hours
+        placeable_hours = problem.placeable_hours
+        strategies = [dict(s) for s in self.strategies]
+        for strategy in strategies:
+            if strategy['solver'] == 'cpsat':
+                # Leave cores for the other workers
+                strategy.setdefault('threads', max(1, (os.cpu_count() or 1) // self.workers))
+
+        outcomes = {}
+        done = queue.Queue()
+        context = multiprocessing.get_context('spawn')
+        pool = context.Pool(processes=min(self.workers, len(strategies)),
+                            initializer=_init_worker, initargs=(problem,))
+        try:
+            for index, strategy in enumerate(strategies):
+                pool.apply_async(_run_strategy, (index, strategy, worker_deadline, conflicts.detail),
+                                 callback=done.put, error_callback=lambda e, i=index: done.put({'index': i, 'error': str(e)}))
+            while len(outcomes) < len(strategies):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self.stopped():
+                    break
+                try:
+                    # Wakes up regularly to notice a cancelled token
+                    outcome = done.get(timeout=min(remaining, CANCEL_POLL_INTERVAL))
+                except queue.Empty:
+                    continue
+                outcomes[outcome['index']] = outcome
+                self.report(workers_done=len(outcomes), workers=len(strategies), hours=total_hours,
+                            placed=max(len(o.get('assignments', ())) for o in outcomes.values()))
+                if len(outcome.get('assignments', ())) >= placeable_hours:
+                    break
+        finally:
+            pool.terminate()
+            pool.join()
+
+        return self._best_result(problem, strategies, outcomes, conflicts)
+
+    def _best_result(self, problem, strategies, outcomes, conflicts):
+        modules = {m['id']: m for m in problem.modules}
+        rooms = {r['id']: r for r in problem.rooms}
+
+        def score(outcome):
+            placed = outcome['assignments']
+            empty_seats = sum(rooms[r]['capacity'] - modules[m]['expected_students'] for m, _, r, _ in placed)
+            return (len(placed), -empty_seats)
+
+        finished = [o for o in outcomes.values() if 'error' not in o]
+        best = max(finished, key=score, default=None)
+
+        workers = []
+        for index, strategy in enumerate(strategies):
+            outcome = outcomes.get(index)
+            if outcome is None:
+                workers.append({'strategy': strategy, 'status': 'cancelled'})
+            elif 'error' in outcome:
+                workers.append({'strategy': strategy, 'status': 'error', 'error': outcome['error']})
+            else:
+                workers.append({
+                    'strategy': strategy,
+                    'status': outcome['status'],
+                    'placed': len(outcome['assignments']),
+                    'seconds': outcome['seconds'],
+                })
+
+        if best is None:
+            return SolveResult([], 'timeout', {'strategy': None, 'workers': workers})
+        conflicts.merge(best['conflicts'])
+        assignments = problem.resolve_assignments(best['assignments'])
+        stats = {'strategy': strategies[best['index']], 'workers': workers}
+        return SolveResult(assignments, best['status'], stats, counters=best['counters'])
@@ -0,0 +1,69 @@
+# Schedule state for the scheduler engine
+
+
+class Assignment:
+    """
+    One placed hour, as dense positions into the problem's modules, lecturers, rooms and
+    timeslots lists. DB ids are only looked up again when the result is saved
+    (see Problem.assignment_keys).
+    """
+
+    __slots__ = ('module', 'lecturer', 'room', 'timeslot')
+
+    def __init__(self, module, lecturer, room, timeslot):
+        self.module = int(module)
+        self.lecturer = int(lecturer)
+        self.room = int(room)
+        self.timeslot = int(timeslot)
+
+    def __repr__(self):
+        return f'<Assignment m={self.module} l={self.lecturer} r={self.room} t={self.timeslot}>'
+
+
+class ScheduleState:
+    """
+    Occupancy of a schedule under construction, indexed for O(1) lookups.
+
+    Lecturer and room occupancy lives in the ProblemMatrices it wraps, so booking through the
+    state also blocks overlapping slots and updates the free room index. On top of that it keeps
+    module_hours, the list of placed hours per module position.
+    """
+
+    def __init__(self, matrices, module_count):
+        self.matrices = matrices
+        self._assignments = {}  # id(assignment) -> assignment, in insertion order
+        self.module_hours = [0] * module_count
+
+    @property
+    def assignments(self):
+        return list(self._assignments.values())
+
+    @property
+    def lecturer_load(self):
+        return self.matrices.lecturer_load
+
+    def __len__(self):
+        return len(self._assignments)
+
+    def __iter__(self):
+        return iter(self._assignments.values())
+
+    def is_lecturer_booked(self, lecturer_idx, timeslot_idx):
+        """True if the lecturer has a booking at this slot or any slot overlapping it."""
+        return self.matrices.lecturer_blocked[lecturer_idx, timeslot_idx] > 0
+
+    def is_room_booked(self, room_idx, timeslot_idx):
+        """True if the room has a booking at this slot or any slot overlapping it."""
+        return self.matrices.room_blocked[room_idx, timeslot_idx] > 0
+
+    def add(self, assignment):
+        """Record an assignment and update every index."""
+        self._assignments[id(assignment)] = assignment
+        self.matrices.book(assignment.lecturer, assignment.room, assignment.timeslot)
+        self.module_hours[assignment.module] += 1
+
+    def remove(self, assignment):
+        """Undo a previously added assignment."""
+        del self._assignments[id(assignment)]
+        self.matrices.release(assignment.lecturer, assignment.room, assignment.timeslot)
+        self.module_hours[assignment.module] -= 1
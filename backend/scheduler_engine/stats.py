@@ -0,0 +1,47 @@
+# Instrumentation of a schedule generation
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+def merge_counters(*counters):
+    """Sums counter dicts, e.g. a construction phase's and an improvement phase's."""
+    total = Counter()
+    for c in counters:
+        total.update(c or {})
+    return dict(total)
+
+
+class RunStats:
+    """
+    Phase timers and counters of one generation or repair.
+
+    Phases are timed around whole steps (load, solve, save, ...), so the cost is a few
+    perf_counter calls per run. Solvers never touch a RunStats in their loops: they count in
+    local variables and report totals once through SolveResult.counters, which are added here.
+    listener, if given, is called with {'type': 'phase', 'phase': name} as each phase starts.
+    """
+
+    def __init__(self, listener=None):
+        self.phases = {}
+        self.counters = Counter()
+        self.listener = listener
+
+    @contextmanager
+    def phase(self, name):
+        if self.listener:
+            self.listener({'type': 'phase', 'phase': name})
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def add(self, counters):
+        self.counters.update(counters or {})
+
+    def as_dict(self):
+        return {
+            'phases': {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            'counters': dict(self.counters),
+        }
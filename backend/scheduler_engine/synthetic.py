@@ -0,0 +1,107 @@
+# Synthetic scheduling instances for load tests and solver benchmarks
+import gzip
+import json
+import random
+from scheduler_engine.problem import Problem
+from scheduler_engine.timeslots import DAYS
+
+# 'uniform': every value in [low, high] equally likely
+# 'skewed': mostly values near low with a long tail up to high, like real room and class sizes
+DISTRIBUTIONS = ('uniform', 'skewed')
+FIRST_SLOT_HOUR = 8
+
+
+def _draw(rng, low, high, distribution):
+    if distribution == 'uniform':
+        return rng.randint(low, high)
+    if distribution == 'skewed':
+        return min(high, low + int((high - low) * (rng.paretovariate(2.0) - 1) / 4))
+    raise ValueError(f"Unknown distribution '{distribution}'. Must be one of: {', '.join(DISTRIBUTIONS)}")
+
+
+def generate_instance(lecturers, modules, rooms, slots_per_day, days=5, availability=0.6,
+                      capacity=(20, 300), students=(10, 250), distribution='skewed',
+                      weekly_hours=(1, 4), max_weekly_hours=(8, 20), seed=None):
+    """
+    Builds a random instance as plain, JSON-serialisable data:
+      - lecturers, modules, rooms, timeslots: lists of dicts with the fields the engine reads,
+        ids numbered from 1
+      - availability: [lecturer_id, timeslot_id] pairs
+    Timeslots are one hour long, slots_per_day of them from 08:00 on the first `days` days of
+    the week. Each lecturer is available in each slot with probability `availability`.
+    capacity and students are (low, high) ranges drawn with `distribution`; weekly_hours and
+    max_weekly_hours are uniform ranges. The same arguments and seed always give the same instance.
+    """
+    if not 1 <= slots_per_day <= 24 - FIRST_SLOT_HOUR:
+        raise ValueError(f"slots_per_day must be between 1 and {24 - FIRST_SLOT_HOUR}")
+    if not 1 <= days <= len(DAYS):
+        raise ValueError(f"days must be between 1 and {len(DAYS)}")
+    rng = random.Random(seed)
+
+    timeslots = []
+    for day in DAYS[:days]:
+        for slot in range(slots_per_day):
+            hour = FIRST_SLOT_HOUR + slot
+            timeslots.append({
+                'id': len(timeslots) + 1,
+                'day': day,
+                'start_time': f'{hour:02d}:00',
+                'end_time': f'{hour + 1:02d}:00',
+                'is_weekend': day in ('Saturday', 'Sunday')
+            })
+    instance = {
+        'params': {
+            'lecturers': lecturers, 'modules': modules, 'rooms': rooms, 'slots_per_day': slots_per_day,
+            'days': days, 'availability': availability, 'capacity': list(capacity),
+            'students': list(students), 'distribution': distribution,
+            'weekly_hours': list(weekly_hours), 'max_weekly_hours': list(max_weekly_hours), 'seed': seed
+        },
+        'lecturers': [
+            {'id': i, 'max_weekly_hours': rng.randint(*max_weekly_hours)}
+            for i in range(1, lecturers + 1)
+        ],
+        'modules': [
+            {'id': i, 'weekly_hours': rng.randint(*weekly_hours),
+             'expected_students': _draw(rng, students[0], students[1], distribution)}
+            for i in range(1, modules + 1)
+        ],
+        'rooms': [
+            {'id': i, 'capacity': _draw(rng, capacity[0], capacity[1], distribution)}
+            for i in range(1, rooms + 1)
+        ],
+        'timeslots': timeslots,
+    }
+    instance['availability'] = [
+        [lecturer['id'], timeslot['id']]
+        for lecturer in instance['lecturers']
+        for timeslot in timeslots
+        if rng.random() < availability
+    ]
+    return instance
+
+
+def problem_from_instance(instance):
+    """A Problem over the instance's weekday timeslots, as load_problem would build it."""
+    lecturer_timeslot_map = {l['id']: set() for l in instance['lecturers']}
+    for lecturer_id, timeslot_id in instance['availability']:
+        lecturer_timeslot_map[lecturer_id].add(timeslot_id)
+    timeslots = [
+        {k: t[k] for k in ('id', 'day', 'start_time', 'end_time')}
+        for t in instance['timeslots'] if not t['is_weekend']
+    ]
+    return Problem(instance['modules'], instance['lecturers'], instance['rooms'], timeslots, lecturer_timeslot_map)
+
+
+def _open(path, mode):
+    return gzip.open(path, mode + 't') if str(path).endswith('.gz') else open(path, mode)
+
+
+def dump_instance(instance, path):
+    """Writes the instance as JSON, gzip-compressed if path ends in .gz."""
+    with _open(path, 'w') as f:
+        json.dump(instance, f)
+
+
+def load_instance(path):
+    with _open(path, 'r') as f:
+        return json.load(f)
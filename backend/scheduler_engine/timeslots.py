@@ -0,0 +1,65 @@
+# Timeslot intervals and overlap detection for the scheduler engine
+import numpy as np
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+MINUTES_PER_DAY = 24 * 60
+
+
+def minute_of_day(time_str):
+    """'HH:MM' (or 'HH:MM:SS') -> minutes since midnight."""
+    hours, minutes = time_str.split(':')[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def timeslot_interval(timeslot):
+    """
+    Returns the timeslot as a half-open (start, end) interval in minutes since Monday 00:00,
+    or None if the dict has no day/start_time/end_time.
+    """
+    day = timeslot.get('day')
+    start = timeslot.get('start_time')
+    end = timeslot.get('end_time')
+    if day not in DAYS or not start or not end:
+        return None
+    offset = DAYS.index(day) * MINUTES_PER_DAY
+    return offset + minute_of_day(start), offset + minute_of_day(end)
+
+
+class OverlapIndex:
+    """
+    For each timeslot id, the set of timeslot ids whose intervals overlap it, itself included,
+    so e.g. Monday 09:00-11:00 and Monday 10:00-11:00 clash although their ids differ.
+    Built once with a sweep over intervals sorted by start; lookups are O(1).
+    Timeslots without times only clash with themselves.
+    """
+
+    def __init__(self, timeslots):
+        self._overlaps = {t['id']: {t['id']} for t in timeslots}
+        intervals = []
+        for t in timeslots:
+            interval = timeslot_interval(t)
+            if interval is not None and interval[1] > interval[0]:
+                intervals.append((interval[0], interval[1], t['id']))
+        intervals.sort()
+
+        active = []  # (end, id) of intervals that started earlier and may still be running
+        for start, end, timeslot_id in intervals:
+            active = [(other_end, other_id) for other_end, other_id in active if other_end > start]
+            for _, other_id in active:
+                self._overlaps[timeslot_id].add(other_id)
+                self._overlaps[other_id].add(timeslot_id)
+            active.append((end, timeslot_id))
+
+    def overlapping(self, timeslot_id):
+        return self._overlaps.get(timeslot_id, {timeslot_id})
+
+    def matrix(self, timeslots):
+        """bool[timeslot, timeslot] in the order of the given list, True where the two overlap."""
+        index = {t['id']: i for i, t in enumerate(timeslots)}
+        overlap = np.eye(len(timeslots), dtype=bool)
+        for i, t in enumerate(timeslots):
+            for other_id in self.overlapping(t['id']):
+                j = index.get(other_id)
+                if j is not None:
+                    overlap[i, j] = True
+        return overlap
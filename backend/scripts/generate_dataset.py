@@ -0,0 +1,143 @@
+"""
+Generates a synthetic institution-sized dataset and bulk-inserts it into the database,
+replacing lecturers, modules, rooms, timeslots and schedules. With --dump the same instance is
+also written to a JSON file (gzip if it ends in .gz) that benchmarks can load without a DB;
+--no-db only writes the file.
+
+    python scripts/generate_dataset.py --lecturers 2000 --modules 3000 --rooms 300 \
+        --slots-per-day 10 --availability 0.6 --seed 1 --dump instance.json.gz
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import time as dt_time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert
+from app import create_app, db
+from app.models.lecturer import Lecturer, lecturer_timeslot
+from app.models.module import Module
+from app.models.program_level import ProgramLevel
+from app.models.room import Room
+from app.models.schedule_entry import ScheduleEntry
+from app.models.schedule_run import ScheduleRun
+from app.models.timeslot import Timeslot
+from scheduler_engine.synthetic import DISTRIBUTIONS, generate_instance, dump_instance
+
+
+def int_range(value):
+    """'LOW:HIGH' -> (LOW, HIGH)"""
+    low, high = (int(v) for v in value.split(':'))
+    if low > high:
+        raise argparse.ArgumentTypeError(f"'{value}': LOW must not exceed HIGH")
+    return low, high
+
+
+def insert_rows(session, table, rows):
+    """Bulk-inserts rows and returns their new ids in the same order."""
+    if not rows:
+        return []
+    return session.scalars(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows).all()
+
+
+def load_into_db(session, instance):
+    """Replaces the scheduling data with the instance; instance ids are remapped to DB ids."""
+    for table in (ScheduleEntry.__table__, ScheduleRun.__table__, lecturer_timeslot,
+                  Lecturer.__table__, Module.__table__, Room.__table__, Timeslot.__table__):
+        session.execute(delete(table))
+
+    program_level = ProgramLevel.query.first()
+    if not program_level:
+        program_level = ProgramLevel(name="Undergraduate")
+        session.add(program_level)
+        session.flush()
+
+    room_ids = insert_rows(session, Room.__table__, [
+        {'name': f"Room {r['id']}", 'capacity': r['capacity']} for r in instance['rooms']
+    ])
+    timeslot_ids = insert_rows(session, Timeslot.__table__, [
+        {
+            'day': t['day'],
+            'start_time': dt_time.fromisoformat(t['start_time']),
+            'end_time': dt_time.fromisoformat(t['end_time']),
+            'is_weekend': t['is_weekend']
+        }
+        for t in instance['timeslots']
+    ])
+    lecturer_ids = insert_rows(session, Lecturer.__table__, [
+        {
+            'name': f"Lecturer {l['id']}",
+            'email': f"lecturer{l['id']}@example.com",
+            'max_weekly_hours': l['max_weekly_hours']
+        }
+        for l in instance['lecturers']
+    ])
+    module_ids = insert_rows(session, Module.__table__, [
+        {
+            'name': f"Module {m['id']}",
+            'code': f"M{m['id']:06d}",
+            'program_level_id': program_level.id,
+            'weekly_hours': m['weekly_hours'],
+            'expected_students': m['expected_students']
+        }
+        for m in instance['modules']
+    ])
+
+    # Instance ids are 1-based positions
+    session.execute(insert(lecturer_timeslot), [
+        {'lecturer_id': lecturer_ids[l - 1], 'timeslot_id': timeslot_ids[t - 1]}
+        for l, t in instance['availability']
+    ])
+    session.commit()
+    return len(lecturer_ids), len(module_ids), len(room_ids), len(timeslot_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lecturers', type=int, default=200)
+    parser.add_argument('--modules', type=int, default=300)
+    parser.add_argument('--rooms', type=int, default=40)
+    parser.add_argument('--slots-per-day', type=int, default=10)
+    parser.add_argument('--days', type=int, default=5)
+    parser.add_argument('--availability', type=float, default=0.6,
+                        help='probability that a lecturer is available in a slot')
+    parser.add_argument('--capacity', type=int_range, default=(20, 300), metavar='LOW:HIGH')
+    parser.add_argument('--students', type=int_range, default=(10, 250), metavar='LOW:HIGH')
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='skewed',
+                        help='distribution of room capacities and module sizes')
+    parser.add_argument('--weekly-hours', type=int_range, default=(1, 4), metavar='LOW:HIGH')
+    parser.add_argument('--max-weekly-hours', type=int_range, default=(8, 20), metavar='LOW:HIGH')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--dump', help='also write the instance to this JSON file (.gz to compress)')
+    parser.add_argument('--no-db', action='store_true', help='only write --dump, leave the database untouched')
+    args = parser.parse_args()
+    if args.no_db and not args.dump:
+        parser.error('--no-db requires --dump')
+
+    started = time.perf_counter()
+    instance = generate_instance(
+        args.lecturers, args.modules, args.rooms, args.slots_per_day, days=args.days,
+        availability=args.availability, capacity=args.capacity, students=args.students,
+        distribution=args.distribution, weekly_hours=args.weekly_hours,
+        max_weekly_hours=args.max_weekly_hours, seed=args.seed
+    )
+    print(f"Generated {len(instance['availability'])} availability rows in {time.perf_counter() - started:.2f}s")
+
+    if args.dump:
+        dump_instance(instance, args.dump)
+        print(f"Wrote {args.dump}")
+    if args.no_db:
+        return
+
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        lecturers, modules, rooms, timeslots = load_into_db(db.session, instance)
+        print(f"Inserted {lecturers} lecturers, {modules} modules, {rooms} rooms, {timeslots} timeslots "
+              f"and {len(instance['availability'])} availability rows in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+import pytest
+from datetime import time
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models.lecturer import Lecturer
+from app.models.module import Module
+from app.models.room import Room
+from app.models.timeslot import Timeslot
+from app.models.program_level import ProgramLevel
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def seed_data():
+    """Two lecturers, two rooms, two modules and four Monday timeslots plus a Saturday one."""
+    program_level = ProgramLevel(name="Test Level")
+    db.session.add(program_level)
+    db.session.commit()
+
+    timeslots = [
+        Timeslot(day="Monday", start_time=time(hour, 0), end_time=time(hour + 1, 0), is_weekend=False)
+        for hour in range(9, 13)
+    ]
+    weekend = Timeslot(day="Saturday", start_time=time(9, 0), end_time=time(10, 0), is_weekend=True)
+    db.session.add_all(timeslots + [weekend])
+    db.session.add_all([
+        Lecturer(name="Alice", email="alice@test.com", specialty="Maths", max_weekly_hours=3),
+        Lecturer(name="Bob", email="bob@test.com", specialty="Physics", max_weekly_hours=4),
+        Room(name="Small Room", capacity=20),
+        Room(name="Large Room", capacity=100),
+        Module(code="M1", name="Module 1", program_level_id=program_level.id, weekly_hours=2, expected_students=15),
+        Module(code="M2", name="Module 2", program_level_id=program_level.id, weekly_hours=2, expected_students=80),
+    ])
+    db.session.commit()
+
+def auth_headers():
+    return {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+
+def test_keyset_pagination(app):
+    from sqlalchemy import desc
+    from app.utils import keyset_paginate
+    seed_data()
+    db.session.add(Lecturer(name="Carol", email="carol@test.com", max_weekly_hours=2))
+    db.session.commit()
+
+    def walk(sort_column, per_page):
+        names, cursor = [], ''
+        while True:
+            (items, pagination), error = keyset_paginate(Lecturer.query, sort_column, Lecturer.id, per_page, cursor)
+            assert error is None
+            names += [lecturer.name for lecturer in items]
+            cursor = pagination['next_cursor']
+            if cursor is None:
+                return names
+
+    # Carol has no specialty: NULLs sort last ascending and first descending
+    assert walk(Lecturer.specialty, 1) == ['Alice', 'Bob', 'Carol']
+    assert walk(desc(Lecturer.specialty), 1) == ['Carol', 'Bob', 'Alice']
+    assert walk(desc(Lecturer.specialty), 2) == ['Carol', 'Bob', 'Alice']
+
+    client = app.test_client()
+    headers = auth_headers()
+    first = client.get('/api/rooms/?per_page=1&sort_by=capacity&sort_order=desc&cursor=&total=exact',
+                       headers=headers).get_json()['data']
+    assert [r['name'] for r in first['rooms']] == ['Large Room']
+    assert first['pagination']['total'] == 2 and first['pagination']['total_estimated'] is False
+    cursor = first['pagination']['next_cursor']
+    second = client.get(f'/api/rooms/?per_page=1&sort_by=capacity&sort_order=desc&cursor={cursor}',
+                        headers=headers).get_json()['data']
+    assert [r['name'] for r in second['rooms']] == ['Small Room']
+    assert second['pagination']['next_cursor'] is None and 'total' not in second['pagination']
+    # A cursor only continues the sort order it was issued for
+    assert client.get(f'/api/rooms/?sort_by=name&cursor={cursor}', headers=headers).status_code == 400
+    assert client.get('/api/rooms/?cursor=bogus', headers=headers).status_code == 400
+
+def test_keyset_pagination_on_a_non_unique_key(app):
+    from app.utils import estimate_count
+    seed_data()
+    # The planner estimate is PostgreSQL-only
+    assert estimate_count(Timeslot.query) is None
+
+    client = app.test_client()
+    headers = auth_headers()
+    ids, cursor, pages = [], '', []
+    while cursor is not None:
+        page = client.get(f'/api/timeslots/?per_page=2&sort_by=day&sort_order=desc&cursor={cursor}&total=estimate',
+                          headers=headers).get_json()['data']
+        ids += [t['id'] for t in page['timeslots']]
+        pages.append(page['pagination'])
+        cursor = page['pagination']['next_cursor']
+    # Four Monday slots share the sort value; the id breaks the tie in the same direction
+    saturday = Timeslot.query.filter_by(day="Saturday").one()
+    mondays = sorted((t.id for t in Timeslot.query.filter_by(day="Monday")), reverse=True)
+    assert ids == [saturday.id] + mondays
+    assert len(pages) == 3 and all(p['total'] == 5 and p['total_estimated'] is False for p in pages)
+
+def test_modules_and_program_levels_list_in_both_pagination_modes(app):
+    seed_data()
+    client = app.test_client()
+    headers = auth_headers()
+
+    for query in ('', '&cursor='):
+        response = client.get(f'/api/modules/?sort_by=code{query}', headers=headers)
+        assert response.status_code == 200
+        modules = response.get_json()['data']['modules']
+        assert [m['code'] for m in modules] == ['M1', 'M2']
+        assert all(m['program_level'] == "Test Level" for m in modules)
+
+        response = client.get(f'/api/program-levels/?sort_by=name{query}', headers=headers)
+        assert response.status_code == 200
+        assert [level['name'] for level in response.get_json()['data']['program_levels']] == ["Test Level"]
@@ -0,0 +1,425 @@
+import pytest
+import time as time_module
+from datetime import time
+from app import create_app, db
+from app.models.lecturer import Lecturer
+from app.models.module import Module
+from app.models.room import Room
+from app.models.timeslot import Timeslot
+from app.models.program_level import ProgramLevel
+from app.models.schedule_entry import ScheduleEntry
+from scheduler_engine.generator import generate_schedule, get_run_entries
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def seed_data():
+    """Two lecturers, two rooms, three modules and four Monday timeslots."""
+    program_level = ProgramLevel(name="Test Level")
+    db.session.add(program_level)
+    db.session.commit()
+
+    timeslots = [
+        Timeslot(day="Monday", start_time=time(hour, 0), end_time=time(hour + 1, 0), is_weekend=False)
+        for hour in range(9, 13)
+    ]
+    weekend = Timeslot(day="Saturday", start_time=time(9, 0), end_time=time(10, 0), is_weekend=True)
+    db.session.add_all(timeslots + [weekend])
+
+    alice = Lecturer(name="Alice", email="alice@test.com", specialty="Maths", max_weekly_hours=3)
+    alice.available_timeslots = timeslots + [weekend]
+    bob = Lecturer(name="Bob", email="bob@test.com", specialty="Physics", max_weekly_hours=4)
+    bob.available_timeslots = timeslots[:2]
+    db.session.add_all([alice, bob])
+
+    db.session.add_all([
+        Room(name="Small Room", capacity=20),
+        Room(name="Large Room", capacity=100),
+    ])
+    db.session.add_all([
+        Module(code="M1", name="Module 1", program_level_id=program_level.id, weekly_hours=2, expected_students=15),
+        Module(code="M2", name="Module 2", program_level_id=program_level.id, weekly_hours=2, expected_students=80),
+        Module(code="M3", name="Module 3", program_level_id=program_level.id, weekly_hours=1, expected_students=10),
+    ])
+    db.session.commit()
+
+def assert_conflict_free(schedule):
+    lecturer_slots = set()
+    room_slots = set()
+    for entry in schedule:
+        lecturer_key = (entry['lecturer_id'], entry['timeslot_id'])
+        room_key = (entry['room_id'], entry['timeslot_id'])
+        assert lecturer_key not in lecturer_slots
+        assert room_key not in room_slots
+        lecturer_slots.add(lecturer_key)
+        room_slots.add(room_key)
+
+def test_generate_schedule_places_all_hours(app):
+    seed_data()
+    result = generate_schedule(db.session)
+
+    schedule = result['schedule']
+    assert len(schedule) == 5
+    assert ScheduleEntry.query.count() == 5
+    assert_conflict_free(schedule)
+    assert set(result['timings']) == {'load', 'solve', 'save'}
+    # The response is built in memory and must match what was written
+    by_id = lambda entries: sorted(entries, key=lambda e: e['id'])
+    assert by_id(schedule) == by_id(get_run_entries(result['run_id']))
+
+    rooms = {r.name: r.id for r in Room.query.all()}
+    large_module = Module.query.filter_by(code="M2").one()
+    for entry in schedule:
+        if entry['module_id'] == large_module.id:
+            assert entry['room_id'] == rooms["Large Room"]
+    assert all(entry['day'] == "Monday" for entry in schedule)
+
+def test_generate_route_conflict_modes(app):
+    seed_data()
+    client = app.test_client()
+
+    response = client.post('/api/schedule/generate')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert 'conflicts' not in data
+    summary = data['conflict_summary']
+    assert summary['total'] == sum(summary['by_type'].values())
+    # M2 does not fit the small room
+    assert summary['by_type']['room_over_capacity'] >= 1
+    assert all('count' in offender for offender in summary['top_offenders'])
+
+    response = client.post('/api/schedule/generate?conflicts=detail')
+    data = response.get_json()
+    assert len(data['conflicts']) == data['conflict_summary']['total']
+
+    response = client.post('/api/schedule/generate?conflicts=everything')
+    assert response.status_code == 400
+
+def test_cpsat_solver_places_hours_greedy_misses(app):
+    program_level = ProgramLevel(name="Test Level")
+    db.session.add(program_level)
+    db.session.commit()
+    slot_a = Timeslot(day="Monday", start_time=time(9, 0), end_time=time(10, 0), is_weekend=False)
+    slot_b = Timeslot(day="Monday", start_time=time(10, 0), end_time=time(11, 0), is_weekend=False)
+    db.session.add_all([slot_a, slot_b])
+    # Greedy spends the flexible lecturer's single hour on 09:00, the only slot the narrow one has
+    flexible = Lecturer(name="Flexible", email="flex@test.com", max_weekly_hours=1)
+    flexible.available_timeslots = [slot_a, slot_b]
+    narrow = Lecturer(name="Narrow", email="narrow@test.com", max_weekly_hours=2)
+    narrow.available_timeslots = [slot_a]
+    db.session.add_all([flexible, narrow, Room(name="Room", capacity=50)])
+    db.session.add_all([
+        Module(code="A", name="A", program_level_id=program_level.id, weekly_hours=1, expected_students=10),
+        Module(code="B", name="B", program_level_id=program_level.id, weekly_hours=1, expected_students=10),
+    ])
+    db.session.commit()
+
+    greedy = generate_schedule(db.session, solver='greedy', ordering='db')
+    assert greedy['status'] == 'partial'
+    assert len(greedy['schedule']) == 1
+
+    exact = generate_schedule(db.session, solver='cpsat', time_limit=5, ordering='db')
+    assert exact['status'] == 'optimal' and exact['solver_stats'] == {'model': 'solved'}
+    assert len(exact['schedule']) == 2
+    assert_conflict_free(exact['schedule'])
+
+def test_generate_route_rejects_unknown_solver(app):
+    response = app.test_client().post('/api/schedule/generate?solver=magic')
+    assert response.status_code == 400
+
+def test_repair_schedule_only_replaces_invalid_entries(app):
+    seed_data()
+    client = app.test_client()
+    first = client.post('/api/schedule/generate').get_json()
+    assert len(first['schedule']) == 5
+    # Nothing changed yet: the run is returned as it is and no new run is saved
+    unchanged_repair = client.post('/api/schedule/repair').get_json()
+    assert unchanged_repair['run_id'] == first['run_id'] and unchanged_repair['cached'] is True
+    assert unchanged_repair['repair'] == {'previous_run_id': first['run_id'], 'kept': 5, 'removed': 0, 'added': 0}
+
+    # Bob loses the 09:00 slot
+    bob = Lecturer.query.filter_by(name="Bob").one()
+    lost_slot = Timeslot.query.filter_by(start_time=time(9, 0), is_weekend=False).one()
+    bob.available_timeslots.remove(lost_slot)
+    db.session.commit()
+    affected = [e for e in first['schedule'] if e['lecturer_id'] == bob.id and e['timeslot_id'] == lost_slot.id]
+    assert affected
+
+    response = client.post('/api/schedule/repair')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['run_id'] != first['run_id']
+    assert data['repair']['previous_run_id'] == first['run_id']
+    assert data['repair']['removed'] == len(affected)
+    assert data['repair']['kept'] == 5 - len(affected)
+    assert_conflict_free(data['schedule'])
+    assert not any(e['lecturer_id'] == bob.id and e['timeslot_id'] == lost_slot.id for e in data['schedule'])
+
+    unchanged = {(e['module_id'], e['lecturer_id'], e['room_id'], e['timeslot_id']) for e in first['schedule']} - \
+        {(e['module_id'], e['lecturer_id'], e['room_id'], e['timeslot_id']) for e in affected}
+    repaired = {(e['module_id'], e['lecturer_id'], e['room_id'], e['timeslot_id']) for e in data['schedule']}
+    assert unchanged <= repaired
+    # The previous run stays in the history
+    assert ScheduleEntry.query.filter_by(run_id=first['run_id']).count() == 5
+    saved = {e['id']: e for e in get_run_entries(data['run_id'])}
+    assert {e['id']: e for e in data['schedule']} == saved
+
+def test_repair_of_partial_run_without_changes_keeps_the_run(app):
+    from app.models.schedule_run import ScheduleRun
+    seed_data()
+    level = ProgramLevel.query.one()
+    # More hours than the lecturers can teach: every run is partial
+    db.session.add(Module(code="M4", name="Module 4", program_level_id=level.id, weekly_hours=6, expected_students=10))
+    db.session.commit()
+    client = app.test_client()
+    first = client.post('/api/schedule/generate').get_json()
+    assert first['status'] == 'partial'
+
+    for _ in range(2):
+        repair = client.post('/api/schedule/repair').get_json()
+        assert repair['run_id'] == first['run_id'] and repair['cached'] is True
+        assert repair['status'] == 'partial' and repair['repair']['added'] == 0
+    assert ScheduleRun.query.count() == 1
+
+def test_repair_without_run_returns_404(app):
+    assert app.test_client().post('/api/schedule/repair').status_code == 404
+
+def test_runs_are_kept_and_pruned(app):
+    from app.models.schedule_run import ScheduleRun
+    from scheduler_engine.history import prune_runs
+
+    seed_data()
+    app.config['SCHEDULE_RUN_RETENTION'] = 2
+    client = app.test_client()
+    run_ids = [client.post('/api/schedule/generate?cache=false').get_json()['run_id'] for _ in range(3)]
+
+    runs = client.get('/api/schedule/runs').get_json()
+    # The oldest run was pruned together with its entries
+    assert [r['run_id'] for r in runs] == run_ids[:0:-1]
+    assert runs[0]['solver'] == 'greedy' and runs[0]['entry_count'] == 5
+    assert ScheduleEntry.query.filter_by(run_id=run_ids[0]).count() == 0
+    assert ScheduleEntry.query.count() == 10
+
+    assert prune_runs(db.session, keep=1, batch_size=2) == 1
+    assert [r.id for r in ScheduleRun.query.all()] == [run_ids[2]]
+    assert ScheduleEntry.query.count() == 5
+
+def test_generate_reuses_run_for_unchanged_input(app):
+    seed_data()
+    client = app.test_client()
+    first = client.post('/api/schedule/generate').get_json()
+    assert first['cached'] is False
+
+    again = client.post('/api/schedule/generate').get_json()
+    assert again['cached'] is True
+    assert again['run_id'] == first['run_id']
+    assert sorted(e['id'] for e in again['schedule']) == sorted(e['id'] for e in first['schedule'])
+    assert again['conflict_summary'] == first['conflict_summary']
+
+    # Other options or changed data give a different fingerprint
+    assert client.post('/api/schedule/generate?ordering=db').get_json()['cached'] is False
+    Room.query.filter_by(name="Small Room").one().capacity = 25
+    db.session.commit()
+    changed = client.post('/api/schedule/generate').get_json()
+    assert changed['cached'] is False and changed['run_id'] != first['run_id']
+
+def test_cache_hit_makes_the_run_latest(app):
+    from scheduler_engine.history import latest_run, prune_runs
+
+    seed_data()
+    client = app.test_client()
+    first = client.post('/api/schedule/generate').get_json()
+    room = Room.query.filter_by(name="Small Room").one()
+    room.capacity = 25
+    db.session.commit()
+    changed = client.post('/api/schedule/generate').get_json()
+    assert latest_run(db.session).id == changed['run_id']
+
+    # Reverting the change returns the first run again, which repairs and retention then use
+    room.capacity = 20
+    db.session.commit()
+    reverted = client.post('/api/schedule/generate').get_json()
+    assert reverted['cached'] is True and reverted['run_id'] == first['run_id']
+    assert latest_run(db.session).id == first['run_id']
+    assert client.post('/api/schedule/repair').get_json()['run_id'] == first['run_id']
+    assert prune_runs(db.session, keep=1) == 1
+    assert latest_run(db.session).id == first['run_id']
+
+def test_stats_block_only_when_requested(app):
+    from app.models.schedule_run import ScheduleRun
+
+    seed_data()
+    client = app.test_client()
+    assert 'stats' not in client.post('/api/schedule/generate').get_json()
+
+    data = client.post('/api/schedule/generate?cache=false&stats=true').get_json()
+    stats = data['stats']
+    assert {'load', 'fingerprint', 'solve', 'save', 'serialize'} <= set(stats['phases'])
+    counters = stats['counters']
+    assert counters['placements'] == counters['rows_written'] == len(data['schedule'])
+    assert counters['candidate_evaluations'] >= counters['placements']
+    # Stored with the run, requested or not
+    run = db.session.get(ScheduleRun, data['run_id'])
+    assert run.summary['stats']['counters'] == counters
+
+def test_presolve_reports_modules_no_room_fits(app):
+    seed_data()
+    program_level = ProgramLevel.query.first()
+    db.session.add(Module(code="M4", name="Module 4", program_level_id=program_level.id, weekly_hours=2,
+                          expected_students=500))
+    db.session.commit()
+
+    result = app.test_client().post('/api/schedule/generate').get_json()
+    assert result['status'] == 'partial'
+    assert len(result['schedule']) == 5
+    presolve = result['presolve']
+    assert presolve['placeable_hours'] == 5 and presolve['total_hours'] == 7
+    large = Module.query.filter_by(code="M4").one()
+    assert presolve['infeasibilities'][0]['module_ids'] == [large.id]
+
+def wait_for_job(client, job_id, timeout=30):
+    deadline = time_module.monotonic() + timeout
+    while time_module.monotonic() < deadline:
+        job = client.get(f'/api/schedule/jobs/{job_id}').get_json()
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        time_module.sleep(0.05)
+    raise AssertionError(f'job {job_id} did not finish')
+
+def test_async_generation_job(app):
+    seed_data()
+    client = app.test_client()
+    response = client.post('/api/schedule/generate?async=true&stats=true')
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+    assert response.headers['Location'].endswith(f'/jobs/{job_id}')
+
+    job = wait_for_job(client, job_id)
+    assert job['status'] == 'succeeded' and job['run_id']
+    assert job['progress']['phase'] == 'commit'
+    result = client.get(f'/api/schedule/jobs/{job_id}/result').get_json()
+    assert result['run_id'] == job['run_id'] and len(result['schedule']) == 5
+    assert 'serialize' in result['stats']['phases']
+
+    assert client.get('/api/schedule/jobs/unknown').status_code == 404
+    repair = client.post('/api/schedule/repair?async=true&ordering=bogus')
+    assert repair.status_code == 400
+
+def test_job_dict_copies_progress():
+    from app.jobs import Job
+    job = Job('generate', {})
+    job.progress['placed'] = 1
+    snapshot = job.as_dict()
+    job.progress['placed'] = 2
+    assert snapshot['progress'] == {'placed': 1}
+
+def test_job_events_stream_progress_and_schedule_chunks(app, monkeypatch):
+    import json
+    from app.routes import schedule as schedule_routes
+    monkeypatch.setattr(schedule_routes, 'STREAM_CHUNK_SIZE', 2)
+
+    seed_data()
+    client = app.test_client()
+    job_id = client.post('/api/schedule/generate?async=true').get_json()['job_id']
+    response = client.get(f'/api/schedule/jobs/{job_id}/events')
+    assert response.mimetype == 'text/event-stream'
+
+    events = []
+    for block in response.get_data(as_text=True).split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if lines:
+            events.append((lines['event'], json.loads(lines['data'])))
+    kinds = [kind for kind, _ in events]
+    assert kinds[-1] == 'done' and 'error' not in kinds
+    progress = [data for kind, data in events if kind == 'progress']
+    assert progress[-1]['status'] == 'succeeded'
+    chunks = [data['entries'] for kind, data in events if kind == 'schedule']
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert {e['run_id'] for c in chunks for e in c} == {events[-1][1]['run_id']}
+
+def test_cancelled_and_deadline_runs(app):
+    from app.models.schedule_run import ScheduleRun
+    from scheduler_engine.cancellation import Cancelled, CancelToken
+
+    seed_data()
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(Cancelled):
+        generate_schedule(db.session, token=token)
+    assert ScheduleRun.query.count() == 0 and ScheduleEntry.query.count() == 0
+
+    # The deadline passes before the first module: the empty best-so-far is saved, never reused
+    client = app.test_client()
+    assert client.post('/api/schedule/generate?max_seconds=0').status_code == 400
+    data = client.post('/api/schedule/generate?max_seconds=1e-9').get_json()
+    assert data['status'] == 'timeout' and data['schedule'] == []
+    again = client.post('/api/schedule/generate?max_seconds=1e-9').get_json()
+    assert again['cached'] is False
+
+    job_id = client.post('/api/schedule/generate?async=true').get_json()['job_id']
+    wait_for_job(client, job_id)
+    assert client.post(f'/api/schedule/jobs/{job_id}/cancel').status_code == 409
+    assert client.post('/api/schedule/jobs/unknown/cancel').status_code == 404
+
+def test_run_entries_are_paged_filtered_and_streamed(app):
+    import json
+    seed_data()
+    client = app.test_client()
+    generated = client.post('/api/schedule/generate').get_json()
+    run_id = generated['run_id']
+
+    pages, after = [], 0
+    while after is not None:
+        page = client.get(f'/api/schedule/runs/{run_id}?limit=2&after={after}').get_json()
+        pages.append(page['entries'])
+        after = page['next_after']
+    assert [len(p) for p in pages] == [2, 2, 1]
+    ids = [e['id'] for p in pages for e in p]
+    assert ids == sorted(e['id'] for e in generated['schedule'])
+
+    lecturer_id = generated['schedule'][0]['lecturer_id']
+    filtered = client.get(f'/api/schedule/runs/{run_id}?lecturer_id={lecturer_id}&day=monday').get_json()
+    assert filtered['entries'] == [e for e in generated['schedule']
+                                   if e['lecturer_id'] == lecturer_id and e['day'] == 'Monday']
+    assert client.get(f'/api/schedule/runs/{run_id}?day=Someday').status_code == 400
+    assert client.get(f'/api/schedule/runs/{run_id}?limit=0').status_code == 400
+    assert client.get('/api/schedule/runs/no-such-run').status_code == 404
+
+    response = client.get(f'/api/schedule/runs/{run_id}?format=jsonl')
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [e['id'] for e in lines] == ids
+
+def test_load_problem_uses_fixed_number_of_queries(app):
+    from sqlalchemy import event
+    from scheduler_engine.loader import load_problem
+
+    seed_data()
+    for i in range(5):
+        db.session.add(Lecturer(name=f"Extra {i}", email=f"extra{i}@test.com", max_weekly_hours=2,
+                                available_timeslots=Timeslot.query.filter_by(is_weekend=False).all()))
+    db.session.commit()
+    db.session.expire_all()
+
+    statements = []
+    def count(*args):
+        statements.append(args)
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        problem = load_problem(db.session)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+
+    assert len(statements) == 5
+    assert len(problem.lecturers) == 7
+    assert {t['day'] for t in problem.timeslots} == {"Monday"}
+    bob = Lecturer.query.filter_by(name="Bob").one()
+    assert problem.lecturer_timeslot_map[bob.id] == {t.id for t in bob.available_timeslots}
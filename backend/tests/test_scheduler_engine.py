@@ -0,0 +1,357 @@
+from scheduler_engine.matrices import ProblemMatrices
+from scheduler_engine.state import Assignment, ScheduleState
+from scheduler_engine.constraints import (
+    is_valid_assignment,
+    has_lecturer_capacity,
+    is_module_complete,
+)
+
+LECTURER = {'id': 1, 'max_weekly_hours': 2}
+MODULE = {'id': 10}
+ROOM = {'id': 100, 'capacity': 30}
+MONDAY_9 = {'id': 1000}
+MONDAY_10 = {'id': 1001}
+
+
+def make_state(lecturers=(LECTURER,), rooms=(ROOM,), timeslots=(MONDAY_9, MONDAY_10), overlap=None):
+    """ScheduleState for one module, with every lecturer available in every slot."""
+    matrices = ProblemMatrices(list(lecturers), list(rooms), list(timeslots),
+                               {l['id']: {t['id'] for t in timeslots} for l in lecturers}, overlap=overlap)
+    return ScheduleState(matrices, 1)
+
+
+def test_state_indexes_assignments():
+    state = make_state()
+    assignment = Assignment(0, 0, 0, 0)
+    state.add(assignment)
+
+    assert len(state) == 1
+    assert state.is_lecturer_booked(0, 0)
+    assert state.is_room_booked(0, 0)
+    assert not state.is_room_booked(0, 1)
+    assert state.lecturer_load[0] == 1
+    assert state.module_hours[0] == 1
+
+    state.remove(assignment)
+    assert len(state) == 0
+    assert not state.is_lecturer_booked(0, 0)
+    assert state.lecturer_load[0] == 0
+    assert state.assignments == []
+
+
+def test_constraints_use_state():
+    state = make_state(lecturers=(LECTURER, {'id': 2, 'max_weekly_hours': 2}),
+                       rooms=(ROOM, {'id': 101, 'capacity': 30}))
+    state.add(Assignment(0, 0, 0, 0))
+
+    # Same lecturer, different room: lecturer clash
+    assert not is_valid_assignment(0, 0, 1, 0, state)
+    # Different lecturer, same room: room clash
+    assert not is_valid_assignment(1, 0, 0, 0, state)
+    assert is_valid_assignment(0, 0, 0, 1, state)
+
+    assert has_lecturer_capacity(0, state)
+    assert not is_module_complete(0, 2, state)
+    state.add(Assignment(0, 0, 0, 1))
+    assert not has_lecturer_capacity(0, state)
+    assert is_module_complete(0, 2, state)
+
+
+def test_matrices_candidate_masks():
+    lecturers = [{'id': 1, 'max_weekly_hours': 1}, {'id': 2, 'max_weekly_hours': 5}]
+    rooms = [{'id': 100, 'capacity': 10}, {'id': 101, 'capacity': 50}]
+    timeslots = [MONDAY_9, MONDAY_10]
+    matrices = ProblemMatrices(lecturers, rooms, timeslots, {1: {1000, 1001}, 2: {1001}})
+
+    lecturer_free, room_free = matrices.candidate_masks({'id': 10, 'expected_students': 20})
+    assert lecturer_free.tolist() == [[True, True], [False, True]]
+    assert room_free.tolist() == [[False, False], [True, True]]
+
+    matrices.book(0, 1, 0)
+    lecturer_free, room_free = matrices.candidate_masks({'id': 10, 'expected_students': 20})
+    # Lecturer 1 hit max_weekly_hours, room 101 is taken at 09:00
+    assert lecturer_free.tolist() == [[False, False], [False, True]]
+    assert room_free.tolist() == [[False, False], [False, True]]
+
+
+def test_conflict_report_aggregates():
+    from scheduler_engine.conflicts import ConflictReport
+
+    report = ConflictReport()
+    for timeslot_id in (1, 2, 3):
+        report.add({'type': 'lecturer_unavailable', 'lecturer_id': 7, 'timeslot_id': timeslot_id, 'module_id': 1})
+    report.add_counts('room_over_capacity', [100, 101], [1, 0])
+
+    assert report.details == []
+    summary = report.summary()
+    assert summary['total'] == 4
+    assert summary['by_type'] == {'lecturer_unavailable': 3, 'room_over_capacity': 1}
+    assert summary['top_offenders'][0] == {'type': 'lecturer_unavailable', 'lecturer_id': 7, 'count': 3}
+
+
+def test_most_constrained_ordering_keeps_large_room_for_large_module():
+    from scheduler_engine.conflicts import ConflictReport
+    from scheduler_engine.problem import Problem
+    from scheduler_engine.solvers.greedy import GreedySolver
+
+    seminar = {'id': 1, 'weekly_hours': 1, 'expected_students': 10}
+    lecture = {'id': 2, 'weekly_hours': 1, 'expected_students': 80}
+    problem = Problem(
+        modules=[seminar, lecture],
+        lecturers=[{'id': 1, 'max_weekly_hours': 5}, {'id': 2, 'max_weekly_hours': 5}],
+        rooms=[{'id': 100, 'capacity': 300}, {'id': 101, 'capacity': 20}],
+        timeslots=[MONDAY_9],
+        lecturer_timeslot_map={1: {MONDAY_9['id']}, 2: {MONDAY_9['id']}},
+    )
+
+    db_order = GreedySolver(ordering='db').solve(problem, ConflictReport())
+    assert db_order.status == 'partial'
+
+    heuristic = GreedySolver(ordering='most_constrained').solve(problem, ConflictReport())
+    assert heuristic.status == 'complete'
+    rooms = {m: r for m, _, r, _ in problem.assignment_keys(heuristic.assignments)}
+    assert rooms == {1: 101, 2: 100}
+
+
+def test_domain_sizes_follow_bookings():
+    import numpy as np
+    from scheduler_engine.matrices import ProblemMatrices
+    from scheduler_engine.ordering import iter_modules, module_domain_sizes
+    from scheduler_engine.synthetic import generate_instance, problem_from_instance
+
+    problem = problem_from_instance(generate_instance(6, 8, 3, 4, seed=3))
+    matrices = ProblemMatrices.from_problem(problem)
+
+    def brute_force(students):
+        lecturer_free = matrices.availability & ~matrices.lecturer_busy
+        lecturer_free &= (matrices.lecturer_load < matrices.max_hours)[:, None]
+        room_free = ~matrices.room_busy & (matrices.capacity[:, None] >= students)
+        return int((lecturer_free & room_free.any(axis=0)).sum())
+
+    # Book a free triple after every pick, as the greedy solver would
+    for mi in iter_modules(problem, matrices, 'most_constrained'):
+        assert list(module_domain_sizes(matrices, problem.students)) == [brute_force(s) for s in problem.students]
+        lecturer_free, room_free = matrices.candidate_masks(problem.modules[mi])
+        pairs = np.argwhere(lecturer_free & room_free.any(axis=0))
+        if len(pairs):
+            li, ti = pairs[0]
+            matrices.book(li, np.flatnonzero(room_free[:, ti])[0], ti)
+
+
+def test_local_search_places_hours_greedy_left_out():
+    from scheduler_engine.conflicts import ConflictReport
+    from scheduler_engine.problem import Problem
+    from scheduler_engine.solvers.greedy import GreedySolver
+    from scheduler_engine.local_search import LocalSearch
+
+    problem = Problem(
+        modules=[{'id': 1, 'weekly_hours': 1, 'expected_students': 10},
+                 {'id': 2, 'weekly_hours': 1, 'expected_students': 10}],
+        lecturers=[{'id': 1, 'max_weekly_hours': 1}, {'id': 2, 'max_weekly_hours': 1}],
+        rooms=[ROOM],
+        timeslots=[MONDAY_9, MONDAY_10],
+        lecturer_timeslot_map={1: {MONDAY_9['id'], MONDAY_10['id']}, 2: {MONDAY_9['id']}},
+    )
+    construction = GreedySolver(ordering='db').solve(problem, ConflictReport())
+    assert len(construction.assignments) == 1
+
+    search = LocalSearch(problem, construction.assignments, seed=1)
+    improved = search.run(time_limit=5)
+    assert len(improved) == 2
+    assert search.missing_modules() == []
+    assert {(l, t) for _, l, _, t in problem.assignment_keys(improved)} == {(1, 1001), (2, 1000)}
+
+
+def test_portfolio_keeps_best_worker_result():
+    from scheduler_engine.conflicts import ConflictReport
+    from scheduler_engine.problem import Problem
+    from scheduler_engine.solvers.portfolio import PortfolioSolver
+
+    problem = Problem(
+        modules=[{'id': 1, 'weekly_hours': 1, 'expected_students': 10},
+                 {'id': 2, 'weekly_hours': 1, 'expected_students': 10}],
+        lecturers=[{'id': 1, 'max_weekly_hours': 1}, {'id': 2, 'max_weekly_hours': 1}],
+        rooms=[ROOM],
+        timeslots=[MONDAY_9, MONDAY_10],
+        lecturer_timeslot_map={1: {MONDAY_9['id'], MONDAY_10['id']}, 2: {MONDAY_9['id']}},
+    )
+    strategies = [{'solver': 'greedy', 'ordering': 'db'}, {'solver': 'lns', 'ordering': 'db', 'seed': 1}]
+    result = PortfolioSolver(time_limit=60, workers=2, strategies=strategies).solve(problem, ConflictReport())
+
+    assert len(result.assignments) == 2
+    assert result.stats['strategy']['solver'] == 'lns'
+    assert [w['strategy']['solver'] for w in result.stats['workers']] == ['greedy', 'lns']
+
+
+def test_portfolio_collects_workers_that_use_their_whole_budget():
+    from scheduler_engine.benchmark import LADDER, instance_for
+    from scheduler_engine.conflicts import ConflictReport
+    from scheduler_engine.solvers.portfolio import PortfolioSolver
+
+    # On 'large', greedy leaves hours out and lns searches until it is stopped
+    problem = instance_for(LADDER[2])
+    strategies = [{'solver': 'greedy', 'ordering': 'db'}, {'solver': 'lns', 'ordering': 'db', 'seed': 0}]
+    result = PortfolioSolver(time_limit=3, workers=2, strategies=strategies).solve(problem, ConflictReport())
+
+    greedy, lns = result.stats['workers']
+    assert lns['status'] != 'cancelled' and lns['placed'] > greedy['placed']
+    assert result.stats['strategy']['solver'] == 'lns'
+    assert len(result.assignments) == lns['placed']
+
+
+def test_overlap_index_detects_overlapping_slots_with_different_ids():
+    from scheduler_engine.timeslots import OverlapIndex
+
+    long_slot = {'id': 1, 'day': 'Monday', 'start_time': '09:00', 'end_time': '11:00'}
+    inner = {'id': 2, 'day': 'Monday', 'start_time': '10:00', 'end_time': '11:00'}
+    after = {'id': 3, 'day': 'Monday', 'start_time': '11:00', 'end_time': '12:00'}
+    tuesday = {'id': 4, 'day': 'Tuesday', 'start_time': '09:30', 'end_time': '10:30'}
+    overlaps = OverlapIndex([long_slot, inner, after, tuesday])
+
+    assert overlaps.overlapping(1) == {1, 2}
+    assert overlaps.overlapping(3) == {3}
+    assert overlaps.overlapping(4) == {4}
+
+    timeslots = [long_slot, inner, after, tuesday]
+    state = make_state(timeslots=timeslots, overlap=overlaps.matrix(timeslots))
+    state.add(Assignment(0, 0, 0, 0))
+    assert state.is_lecturer_booked(0, 1)
+    assert state.is_room_booked(0, 1)
+    assert not state.is_lecturer_booked(0, 2)
+
+
+def test_solvers_do_not_double_book_overlapping_slots():
+    from scheduler_engine.conflicts import ConflictReport
+    from scheduler_engine.problem import Problem
+    from scheduler_engine.solvers import get_solver
+
+    long_slot = {'id': 1, 'day': 'Monday', 'start_time': '09:00', 'end_time': '11:00'}
+    inner = {'id': 2, 'day': 'Monday', 'start_time': '10:00', 'end_time': '11:00'}
+    problem = Problem(
+        modules=[{'id': 1, 'weekly_hours': 1, 'expected_students': 10},
+                 {'id': 2, 'weekly_hours': 1, 'expected_students': 10}],
+        lecturers=[{'id': 1, 'max_weekly_hours': 5}],
+        rooms=[ROOM],
+        timeslots=[long_slot, inner],
+        lecturer_timeslot_map={1: {1, 2}},
+    )
+    for name in ('greedy', 'cpsat', 'lns'):
+        result = get_solver(name, time_limit=2, seed=0).solve(problem, ConflictReport())
+        assert len(result.assignments) == 1, name
+
+
+def test_cpsat_reports_an_abandoned_model_build():
+    from scheduler_engine.benchmark import LADDER, instance_for
+    from scheduler_engine.conflicts import ConflictReport
+    from scheduler_engine.solvers import get_solver
+
+    # Greedy in db order leaves hours out of 'large'; no time is left to build the model
+    problem = instance_for(LADDER[2])
+    result = get_solver('cpsat', time_limit=1e-6, ordering='db').solve(problem, ConflictReport())
+    assert result.stats == {'model': 'abandoned'}
+    assert 0 < len(result.assignments) < problem.placeable_hours
+
+
+def test_free_room_index_finds_smallest_fitting_room():
+    rooms = [{'id': 100, 'capacity': 300}, {'id': 101, 'capacity': 20}, {'id': 102, 'capacity': 40}]
+    long_slot = {'id': 1, 'day': 'Monday', 'start_time': '09:00', 'end_time': '11:00'}
+    inner = {'id': 2, 'day': 'Monday', 'start_time': '10:00', 'end_time': '11:00'}
+    from scheduler_engine.timeslots import OverlapIndex
+    overlap = OverlapIndex([long_slot, inner]).matrix([long_slot, inner])
+    matrices = ProblemMatrices([LECTURER], rooms, [long_slot, inner], {1: {1, 2}}, overlap=overlap)
+
+    assert matrices.free_rooms.best_fit(0, 20) == 1
+    assert matrices.free_rooms.best_fit(0, 21) == 2
+    assert matrices.free_rooms.best_fit(0, 301) is None
+
+    # Booking the 20-seat room 09:00-11:00 also takes it out of 10:00-11:00
+    matrices.book(0, 1, 0)
+    assert matrices.free_rooms.best_fit(1, 10) == 2
+    matrices.release(0, 1, 0)
+    assert matrices.free_rooms.best_fit(1, 10) == 1
+
+
+def test_synthetic_instances_are_reproducible(tmp_path):
+    from scheduler_engine.synthetic import generate_instance, dump_instance, load_instance, problem_from_instance
+
+    instance = generate_instance(lecturers=20, modules=30, rooms=5, slots_per_day=4, days=6, seed=7)
+    assert instance == generate_instance(lecturers=20, modules=30, rooms=5, slots_per_day=4, days=6, seed=7)
+    assert all(20 <= r['capacity'] <= 300 for r in instance['rooms'])
+
+    path = tmp_path / 'instance.json.gz'
+    dump_instance(instance, path)
+    assert load_instance(path) == instance
+
+    problem = problem_from_instance(load_instance(path))
+    assert len(problem.modules) == 30 and len(problem.lecturers) == 20
+    # Saturday slots are left out, like load_problem does
+    assert len(problem.timeslots) == 20
+    assert sum(len(slots) for slots in problem.lecturer_timeslot_map.values()) == len(instance['availability'])
+
+
+def test_benchmark_comparison_flags_regressions():
+    from scheduler_engine.benchmark import LADDER, compare_results, run_benchmarks
+
+    results = run_benchmarks(sizes=[LADDER[0]['name']], strategies=[{'solver': 'greedy', 'ordering': 'db'}])
+    (key, metrics), = results.items()
+    assert set(metrics) == {'seconds', 'peak_mb', 'placed', 'hours', 'placement_rate', 'conflicts', 'placeable_hours'}
+    assert metrics['placed'] <= metrics['placeable_hours'] < metrics['hours']
+    assert compare_results(results, results) == []
+
+    worse = {key: dict(metrics, seconds=metrics['seconds'] + 1, placement_rate=metrics['placement_rate'] - 0.1)}
+    messages = compare_results(worse, results)
+    assert len(messages) == 2 and all(m.startswith(key) for m in messages)
+    # Noise on sub-MIN_SECONDS timings is ignored
+    assert compare_results({key: dict(metrics, seconds=0.04)}, {key: dict(metrics, seconds=0.01)}) == []
+
+
+def test_presolve_bounds_placeable_hours():
+    from scheduler_engine.conflicts import ConflictReport
+    from scheduler_engine.presolve import presolve
+    from scheduler_engine.problem import Problem
+    from scheduler_engine.solvers.greedy import GreedySolver
+
+    # Three lecturers share Monday 9:00 but only two rooms exist; only lecturer 3 can teach at 10:00
+    problem = Problem(
+        modules=[{'id': 1, 'weekly_hours': 4, 'expected_students': 10},
+                 {'id': 2, 'weekly_hours': 2, 'expected_students': 500}],
+        lecturers=[{'id': l, 'max_weekly_hours': 2} for l in (1, 2, 3)],
+        rooms=[ROOM, {'id': 101, 'capacity': 30}],
+        timeslots=[MONDAY_9, MONDAY_10],
+        lecturer_timeslot_map={1: {1000}, 2: {1000}, 3: {1000, 1001}},
+    )
+    report = presolve(problem)
+    assert report.infeasible
+    assert report.total_hours == 6 and report.placeable_hours == 3
+    by_type = {i['type']: i for i in report.infeasibilities}
+    assert by_type['module_exceeds_rooms']['module_ids'] == [2]
+    # Lecturer and room totals (4 hours each) cannot prove it, the flow bound does
+    assert set(by_type) == {'module_exceeds_rooms', 'assignment_bound'}
+    assert by_type['assignment_bound']['shortfall'] == 1
+
+    scoped = report.scoped_problem()
+    assert [m['id'] for m in scoped.modules] == [1] and scoped.placeable_hours == 3
+    assert len(GreedySolver().solve(scoped, ConflictReport()).assignments) == 3
+
+
+def test_cancel_token_stops_solvers_with_best_schedule_so_far():
+    import threading
+    import time
+    from scheduler_engine.benchmark import LADDER, instance_for
+    from scheduler_engine.cancellation import CancelToken
+    from scheduler_engine.conflicts import ConflictReport
+    from scheduler_engine.solvers import get_solver
+
+    problem = instance_for(LADDER[1])
+    greedy = get_solver('greedy')
+    greedy.token = CancelToken(max_seconds=0)
+    result = greedy.solve(problem, ConflictReport())
+    assert result.status == 'timeout' and result.assignments == []
+
+    lns = get_solver('lns', time_limit=30, seed=0)
+    lns.token = CancelToken()
+    threading.Timer(0.3, lns.token.cancel).start()
+    started = time.monotonic()
+    result = lns.solve(problem, ConflictReport())
+    assert time.monotonic() - started < 5
+    assert len(result.assignments) > 0
@@ -1,7 +1,16 @@
 import React from 'react';
 
-const ConflictsList = ({ conflicts }) => {
-  if (!conflicts || conflicts.length === 0) {
+const CONFLICT_LABELS = {
+  lecturer_unavailable: 'Lecturer unavailable',
+  room_over_capacity: 'Room over capacity',
+  lecturer_overlap: 'Lecturer double-booked'
+};
+
+// Shows the conflict summary of a generation (totals and top offenders) and, once the user
+// asks for it, the full list of conflicts
+const ConflictsList = ({ summary, conflicts, onShowDetail, isLoading }) => {
+  const hasDetail = conflicts && conflicts.length > 0;
+  if ((!summary || summary.total === 0) && !hasDetail) {
     return null;
   }
 
@@ -18,18 +27,60 @@ const ConflictsList = ({ conflicts }) => {
     }
   };
 
+  const getOffenderLabel = (offender) => {
+    const label = CONFLICT_LABELS[offender.type] || offender.type;
+    if (offender.lecturer_id !== undefined) {
+      return `${label}: lecturer #${offender.lecturer_id}`;
+    }
+    if (offender.room_id !== undefined) {
+      return `${label}: room #${offender.room_id}`;
+    }
+    return label;
+  };
+
   return (
     <div className="mt-4">
       <h3 className="text-lg font-semibold text-red-600 mb-2">Conflicts Found:</h3>
-      <ul className="list-disc list-inside space-y-2">
-        {conflicts.map((conflict, index) => (
-          <li key={index} className="text-red-500">
-            {getConflictMessage(conflict)}
-          </li>
-        ))}
-      </ul>
+      {summary && (
+        <>
+          <p className="text-red-500 mb-2">
+            {summary.total} conflicts
+            {Object.entries(summary.by_type || {}).map(([type, count]) => (
+              <span key={type} className="ml-3">{CONFLICT_LABELS[type] || type}: {count}</span>
+            ))}
+          </p>
+          {summary.top_offenders && summary.top_offenders.length > 0 && (
+            <ul className="list-disc list-inside space-y-2 mb-2">
+              {summary.top_offenders.map((offender, index) => (
+                <li key={index} className="text-red-500">
+                  {getOffenderLabel(offender)} ({offender.count})
+                </li>
+              ))}
+            </ul>
+          )}
+        </>
+      )}
+      {hasDetail ? (
+        <ul className="list-disc list-inside space-y-2">
+          {conflicts.map((conflict, index) => (
+            <li key={index} className="text-red-500">
+              {getConflictMessage(conflict)}
+            </li>
+          ))}
+        </ul>
+      ) : (
+        onShowDetail && (
+          <button
+            onClick={onShowDetail}
+            disabled={isLoading}
+            className="text-sm font-medium text-indigo-600 hover:text-indigo-800"
+          >
+            Show every conflict
+          </button>
+        )
+      )}
     </div>
   );
 };
 
-export default ConflictsList; 
\ No newline at end of file
+export default ConflictsList;
@@ -58,6 +58,7 @@ const mockConflicts = [
 const SchedulePage = () => {
   const [schedule, setSchedule] = useState([]);
   const [conflicts, setConflicts] = useState([]);
+  const [conflictSummary, setConflictSummary] = useState(null);
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState(null);
   const [viewMode, setViewMode] = useState('calendar'); // 'calendar' or 'table'
@@ -103,11 +104,13 @@ const SchedulePage = () => {
     });
   }, [schedule, selectedRoom, selectedLecturer, selectedDay]);
 
-  const handleGenerate = async () => {
+  // detail asks for every conflict as well as the summary; on large schedules that list is
+  // huge and bypasses the cache of earlier runs, so it is only fetched on request
+  const generate = async (detail) => {
     setIsLoading(true);
     setError(null);
     try {
-      const response = await fetch('/api/schedule/generate', {
+      const response = await fetch(`/api/schedule/generate${detail ? '?conflicts=detail' : ''}`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -123,7 +126,8 @@ const SchedulePage = () => {
 
       const data = await response.json();
       setSchedule(data.schedule);
-      setConflicts(data.conflicts);
+      setConflictSummary(data.conflict_summary || null);
+      setConflicts(data.conflicts || []);
     } catch (err) {
       setError(err.message);
     } finally {
@@ -131,6 +135,9 @@ const SchedulePage = () => {
     }
   };
 
+  const handleGenerate = () => generate(false);
+  const handleShowConflicts = () => generate(true);
+
   return (
     <div className="container mx-auto max-w-7xl py-8 px-4">
       <div className="flex justify-between items-center mb-8">
@@ -190,7 +197,12 @@ const SchedulePage = () => {
           </section>
           
           <section>
-            <ConflictsList conflicts={conflicts} />
+            <ConflictsList
+              summary={conflictSummary}
+              conflicts={conflicts}
+              onShowDetail={handleShowConflicts}
+              isLoading={isLoading}
+            />
           </section>
         </>
       )}
@@ -16,6 +16,7 @@ from app.models.timeslot import Timeslot
 from app.models.user import User
 from app.models.program_level import ProgramLevel
 from app.models.schedule_entry import ScheduleEntry
+from app.models.schedule_run import ScheduleRun
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.